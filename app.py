@@ -1,9 +1,32 @@
-from flask import Flask, render_template, send_from_directory, request, redirect, url_for, jsonify, flash, session
+from flask import Flask, render_template, send_from_directory, request, redirect, url_for, jsonify, flash, session, g
 import os
 import pandas as pd
+import numpy as np
 import json
+import threading
+import hashlib
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from functools import cached_property
 import requests
 
+from src.artifact_registry import DATA_FILE, LABELS_FILE, MODEL_FILES, SNAPSHOT_FILE, ArtifactRegistry
+from src.attendance_snapshot import load_snapshot
+from src.cluster_labels import load_labels
+from src.cluster_scoring import ClusterScorer, ScoringError
+from src.dashboard_summary import build_dashboard_summary
+from src.employee_query import QUERY_PARAMS, QueryError, filter_mask, query_employees
+from src.history_store import KEY as HISTORY_KEY, ROLLING_METRICS, ROLLING_WINDOW, SHORT_WINDOW, HistoryStore, check_period, series_columns
+from src.http_cache import ETAG_SUFFIXES, available_encodings, choose_encoding, compress, etag_variants
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REQUEST_DURATION, record_cache, registry as metrics_registry, span
+from src.organization_data import build_organization_data
+from src.peer_index import DEFAULT_NEIGHBOURS, MAX_NEIGHBOURS, PeerIndex
+from src.profiling import RequestProfiler
+from src.recommendation_service import PENDING, READY, RecommendationService, inputs_digest
+from src.recommendation_store import RecommendationStore
+from src.search_index import SearchIndex
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-in-production'  # Change this in production
 
@@ -12,102 +35,551 @@ application = app
 
 # Flask will automatically look for templates in 'templates/' and static files in 'static/'
 
-def load_attendance_data():
-    """Load and process attendance data from CSV"""
+# Use absolute path for Vercel compatibility
+CSV_PATH = os.path.join(os.path.dirname(__file__), 'data', DATA_FILE)
+
+# Trained model, scaler and their metadata, used until train_model.py publishes a run
+MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+# Versioned training runs; the current one is hot-swapped in when train_model.py publishes a new one
+ARTIFACTS_ROOT = os.path.join(os.path.dirname(__file__), 'artifacts')
+
+# Cluster id -> behavior label and website display cluster, saved with the model by training
+CLUSTER_LABELS_PATH = os.path.join(MODELS_DIR, 'cluster_labels.json')
+
+RECOMMENDATIONS_DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'recommendations.db')
+
+# Gemini endpoint, overridable to point at a local stub server
+GEMINI_API_URL = os.environ.get(
+    'GEMINI_API_URL',
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+)
+
+# How long /api/recommendations/<id> blocks on Gemini by default (its timeout is 20s)
+RECOMMENDATION_WAIT_SECONDS = 25
+
+# One pooled HTTP session so Gemini calls reuse their TLS connections
+gemini_session = requests.Session()
+gemini_session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=16))
+
+# Browsers may keep API responses but must revalidate them (a cheap 304), so a retrain shows up at once
+API_CACHE_CONTROL = 'private, no-cache'
+
+# Page size for /api/search_employee (type-ahead only needs the top few matches)
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Largest batch accepted by /api/score in one request
+SCORE_MAX_RECORDS = 10000
+
+# Opt-in request profiling: fraction of requests to profile (0 disables) and where the reports go
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+# 'cprofile' (.prof files) or 'pyinstrument' (HTML, when installed)
+PROFILER = os.environ.get('PROFILER', 'cprofile')
+
+# Responses whose bodies preload() builds (in every content coding) before gunicorn forks the workers
+PRELOAD_URLS = ('/api/employees', '/api/dashboard/summary', '/api/organization_data')
+
+def to_percent(values):
+    """Convert values given as decimals (<= 1) to percentages"""
+    return np.where(values <= 1, values * 100, values)
+
+def optional_column(df, column):
+    """Return a numeric column as floats, or zeros if the CSV does not have it"""
+    if column not in df:
+        return np.zeros(len(df))
+    return df[column].to_numpy(dtype=float)
+
+def int_list(values):
+    """Truncate floats to ints like int(), missing values (NaN) become None (JSON null)"""
+    missing = np.isnan(values)
+    ints = np.where(missing, 0, values).astype(int).tolist()
+    if not missing.any():
+        return ints
+    return [None if gap else value for value, gap in zip(ints, missing.tolist())]
+
+def float_list(values, digits=None):
+    """Floats as a list, optionally rounded, missing values (NaN) become None (JSON null)"""
+    # np.round rounds the scaled binary value, so keep Python's correctly rounded round()
+    return [
+        None if value != value else value if digits is None else round(value, digits)
+        for value in values.tolist()
+    ]
+
+def percent_ints(values):
+    """Percentages as ints, skipping the periods without a value (NaN)"""
+    return [int(value) for value in values if value == value]
+
+def history_columns(df, efficiency, rollups):
+    """Monthly efficiency series and trend of each employee from the history rollups
+
+    The series covers the recorded months of the last 12 calendar months,
+    oldest first; the trend is the change in efficiency points since the
+    previous recorded month within them. Employees without history get their current efficiency
+    as a one-month series (none without an efficiency) and a trend of 0"""
+    monthly = [[] if value is None else [value] for value in int_list(efficiency)]
+    trend = np.zeros(len(df), dtype=int)
+    if rollups is None or len(rollups) == 0:
+        return monthly, trend
+
+    positions = pd.Index(rollups[HISTORY_KEY]).get_indexer(df['Fake_Id'])
+    found = np.flatnonzero(positions >= 0)
+    series = to_percent(rollups[series_columns()].to_numpy(dtype=float)[positions[found]])
+    if np.isnan(series).any():
+        found_monthly = [percent_ints(row) for row in series.tolist()]
+    else:
+        found_monthly = series.astype(int).tolist()
+    for position, values in zip(found.tolist(), found_monthly):
+        monthly[position] = values
+
+    previous = to_percent(rollups['efficiency_previous'].to_numpy(dtype=float)[positions[found]])
+    change = np.rint(efficiency[found] - previous)
+    trend[found] = np.where(np.isnan(change), 0, change).astype(int)
+    return monthly, trend
+
+def display_clusters(labels):
+    """Map CSV cluster ids to website display clusters
+    Website: 1=Consistent Performer(Green), 2=Silent Overworker(Orange), 3=Late Starter(Orange), 4=Erratic/At-Risk(Red)"""
+    return {cluster: entry['display'] for cluster, entry in labels.items()}
+
+def build_employee_columns(df, cluster_mapping, rollups=None):
+    """Derive the website employee fields from processed attendance data, one column at a time
+
+    rollups are the history's rolling aggregates (see HistoryStore.rollups)
+    the monthly series and trends come from. Missing numeric values (e.g. the
+    punctuality of an employee without an in time) are None, sent as null"""
+    efficiency = to_percent(df['efficiency'].to_numpy(dtype=float))
+    punctuality = to_percent(df['punctuality'].to_numpy(dtype=float))
+
+    # Calculate attendance rate (assuming 100% - absenteeism), kept between 0-100
+    attendance = 100 - (df['absenteeism_days'].to_numpy(dtype=float) * 2)  # Rough calculation
+    attendance = np.clip(np.nan_to_num(attendance, nan=100), 0, 100)
+
+    # Use the actual name from the CSV
+    ids = df['Fake_Id'].astype(str)
+    names = df['Name'].where(df['Name'].notna(), 'Employee ' + ids) if 'Name' in df else 'Employee ' + ids
+
+    # Recorded monthly efficiency and its change since the previous month
+    monthly, trend = history_columns(df, efficiency, rollups)
+
+    clusters = df['Cluster'].astype(int).map(cluster_mapping)
+    if clusters.isna().any():
+        raise KeyError(f"Unknown cluster ids: {sorted(df['Cluster'][clusters.isna()].unique())}")
+
+    efficiency_int = int_list(efficiency)
+
+    # Extract work hours data - use the numeric columns, not the time-formatted ones
+    return {
+        'id': ids.tolist(),
+        'name': names.tolist(),
+        'designation': df['Designation'].tolist(),
+        'efficiency': efficiency_int,
+        'attendance': attendance.astype(int).tolist(),
+        'bayHours': float_list(df['bay_hours'].to_numpy(dtype=float), 1),
+        'cafeteriaHours': float_list(optional_column(df, 'cafeteria_hours')),
+        'oooHours': float_list(optional_column(df, 'avg_ooo_hours')),
+        'officeHours': float_list(optional_column(df, 'avg_office_hours')),
+        'breakHours': float_list(optional_column(df, 'avg_break_hours')),
+        'score': efficiency_int,  # Performance score is based on efficiency
+        'trend': trend.tolist(),
+        'cluster': clusters.astype(int).tolist(),  # Map CSV cluster to website cluster
+        'clusterType': df['Behavior_Type'].tolist(),  # Use the actual behavior type from CSV
+        'punctuality': int_list(punctuality),
+        'monthly': monthly,
+        'accountCode': df['Account_code'].tolist(),
+        'recruitment_type': df['Recruitment_Type'].tolist(),
+        'absenteeism_days': float_list(optional_column(df, 'absenteeism_days')),  # Required for risk assessment
+        'burnout_hours': float_list(optional_column(df, 'burnout_hours'))  # Required for risk assessment
+    }
+
+def read_processed_attendance(path=CSV_PATH):
+    """Read processed attendance data (binary snapshot or CSV), None if it is missing or unreadable"""
+    try:
+        if path.endswith('.npz'):
+            return load_snapshot(path)
+        return pd.read_csv(path)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+def load_attendance_data(df=None, labels=None, rollups=None):
+    """Load and process attendance data from CSV (or an already loaded DataFrame)"""
     try:
-        # Use absolute path for Vercel compatibility
-        csv_path = os.path.join(os.path.dirname(__file__), 'data', 'processed_attendance.csv')
-        df = pd.read_csv(csv_path)
+        if df is None:
+            df = pd.read_csv(CSV_PATH)
+        if labels is None:
+            labels = load_labels(CLUSTER_LABELS_PATH)
         
         # Clean and prepare the data
-        employees = []
-        for _, row in df.iterrows():
-            # Convert efficiency to percentage if it's in decimal
-            efficiency = float(row['efficiency'])
-            if efficiency <= 1:
-                efficiency = efficiency * 100
-            
-            # Convert punctuality to percentage if it's in decimal
-            punctuality = float(row['punctuality'])
-            if punctuality <= 1:
-                punctuality = punctuality * 100
-            
-            # Calculate attendance rate (assuming 100% - absenteeism)
-            attendance = 100 - (float(row['absenteeism_days']) * 2)  # Rough calculation
-            attendance = max(0, min(100, attendance))  # Ensure it's between 0-100
-            
-            # Use the actual name from the CSV
-            name = row['Name'] if pd.notna(row['Name']) else f"Employee {row['Fake_Id']}"
-            
-            # Create monthly performance data (simulated based on efficiency)
-            base_score = efficiency
-            monthly = []
-            for i in range(12):
-                # Add some variance around the base efficiency
-                variance = (i % 3 - 1) * 5  # ±5 variance
-                score = max(60, min(100, base_score + variance))
-                monthly.append(int(score))
-            
-            # Map CSV clusters to website display clusters based on new order
-            # CSV: 0=Consistent Performer, 1=Late Starter, 2=Erratic/At-Risk, 3=Silent Overworker
-            # Website: 1=Consistent Performer(Green), 2=Silent Overworker(Orange), 3=Late Starter(Orange), 4=Erratic/At-Risk(Red)
-            csv_cluster = int(row['Cluster'])
-            cluster_mapping = {
-                0: 1,  # Consistent Performer → Website Cluster 1 (Green)
-                1: 3,  # Late Starter → Website Cluster 3 (Orange)
-                2: 4,  # Erratic / At-Risk → Website Cluster 4 (Red)
-                3: 2   # Silent Overworker → Website Cluster 2 (Orange)
-            }
-            
-            # Extract work hours data - use the numeric columns, not the time-formatted ones
-            cafeteria_hours = float(row.get('cafeteria_hours', 0))
-            ooo_hours = float(row.get('avg_ooo_hours', 0))
-            office_hours = float(row.get('avg_office_hours', 0))
-            break_hours = float(row.get('avg_break_hours', 0))
-            
-            # Extract absenteeism and burnout data for risk assessment
-            absenteeism_days = float(row.get('absenteeism_days', 0))
-            burnout_hours = float(row.get('burnout_hours', 0))
-            
-            employee = {
-                'id': str(row['Fake_Id']),
-                'name': name,
-                'designation': row['Designation'],
-                'efficiency': int(efficiency),
-                'attendance': int(attendance),
-                'bayHours': round(float(row['bay_hours']), 1),
-                'cafeteriaHours': cafeteria_hours,
-                'oooHours': ooo_hours,
-                'officeHours': office_hours,
-                'breakHours': break_hours,
-                'score': int(efficiency),  # Performance score is based on efficiency
-                'trend': 5 if efficiency > 75 else -2,  # Simple trend calculation
-                'cluster': cluster_mapping[csv_cluster],  # Map CSV cluster to website cluster
-                'clusterType': row['Behavior_Type'],  # Use the actual behavior type from CSV
-                'punctuality': int(punctuality),
-                'monthly': monthly,
-                'accountCode': row['Account_code'],
-                'recruitment_type': row['Recruitment_Type'],
-                'absenteeism_days': absenteeism_days,  # Required for risk assessment
-                'burnout_hours': burnout_hours  # Required for risk assessment
-            }
-            employees.append(employee)
+        columns = build_employee_columns(df, display_clusters(labels), rollups)
+        fields = list(columns)
+        employees = [dict(zip(fields, values)) for values in zip(*columns.values())]
         
         return employees
     except Exception as e:
         import traceback
         print(f"Error loading CSV data: {e}")
         print(f"Traceback: {traceback.format_exc()}")
-        # Return mock data as fallback
-        return [
-            {
-                'id': '789012', 'name': 'John Doe', 'designation': 'Senior Software Engineer',
-                'efficiency': 92, 'attendance': 95, 'bayHours': 7.5, 'cafeteriaHours': 0.5, 'oooHours': 0.8,
-                'officeHours': 8.0, 'breakHours': 1.0, 'score': 85, 'trend': 5, 
-                'cluster': 2, 'clusterType': 'Consistent Performer', 'punctuality': 95,
-                'monthly': [82, 88, 85, 90, 85, 88, 92, 85, 80, 88, 85, 90]
-            }
-        ]
+        return fallback_employees()
+
+def fallback_employees():
+    """Mock data served when no attendance data can be loaded"""
+    return [
+        {
+            'id': '789012', 'name': 'John Doe', 'designation': 'Senior Software Engineer',
+            'efficiency': 92, 'attendance': 95, 'bayHours': 7.5, 'cafeteriaHours': 0.5, 'oooHours': 0.8,
+            'officeHours': 8.0, 'breakHours': 1.0, 'score': 85, 'trend': 5, 
+            'cluster': 2, 'clusterType': 'Consistent Performer', 'punctuality': 95,
+            'monthly': [82, 88, 85, 90, 85, 88, 92, 85, 80, 88, 85, 90]
+        }
+    ]
+
+class EmployeeSnapshot:
+    """Immutable view of the employee data built from one version of the CSV"""
+
+    def __init__(self, employees, signature, source=None, labels=None):
+        self.employees = employees
+        self.signature = signature
+        # Processed attendance DataFrame the employees were built from, None if it failed to load
+        self.source = source
+        # Cluster id → behavior label and display cluster the employees were built with
+        self.labels = labels if labels is not None else load_labels(CLUSTER_LABELS_PATH)
+        self.version = '-'.join(format(part, 'x') for part in signature[1:]) if signature else 'none'
+        # Fake_Id → record index, built in reverse so the first duplicate id wins as in a linear scan
+        self.by_id = {emp['id']: emp for emp in reversed(employees)}
+        # Built with the snapshot rather than on the first search, which would stall after every data swap
+        with span('search_index'):
+            self.search_index = SearchIndex(employees)
+        # Serialize once so the hot endpoints can skip jsonify entirely
+        with span('serialize'):
+            self.employees_json = app.json.dumps(employees, separators=(",", ":")) + "\n"
+        # Newest of the data, labels and history files, sent as Last-Modified
+        self.last_modified = (
+            datetime.fromtimestamp(max(signature[1], *signature[3:]) // 10**9, timezone.utc) if signature else None
+        )
+        # Response bodies by key, and their compressed variants by (key, encoding), built on first request
+        self._bodies = {}
+
+    def body(self, key, build):
+        """Return the (body, headers) build() makes for key, built once per snapshot"""
+        cached = self._bodies.get(key)
+        record_cache('response_body', cached is not None)
+        if cached is None:
+            with span('build_response'):
+                cached = self._bodies[key] = build()
+        return cached
+
+    def compressed(self, key, body, encoding):
+        """Return body compressed with encoding, compressed once per snapshot"""
+        cached = self._bodies.get((key, encoding))
+        record_cache('compressed_body', cached is not None)
+        if cached is None:
+            with span('compress'):
+                cached = self._bodies[(key, encoding)] = compress(body, encoding)
+        return cached
+
+    @cached_property
+    def frame(self):
+        """Columnar copy of the scalar employee fields used to filter and sort"""
+        return pd.DataFrame.from_records(self.employees, exclude=['monthly'])
+
+    @cached_property
+    def summary_json(self):
+        """Serialized dashboard aggregates, computed once per snapshot"""
+        summary = build_dashboard_summary(self.frame)
+        with span('serialize'):
+            return app.json.dumps(summary) + "\n"
+
+    @cached_property
+    def organization_json(self):
+        """Serialized department aggregates, computed once per snapshot"""
+        if self.source is None:
+            raise ValueError('Processed attendance data is not available')
+        organization = build_organization_data(self.source, display_clusters(self.labels))
+        with span('serialize'):
+            return app.json.dumps(organization) + "\n"
+
+    @cached_property
+    def peer_averages(self):
+        """Per-cluster averages for the recommendations prompt"""
+        return peer_averages(self.frame)
+
+    @cached_property
+    def peer_index(self):
+        """Percentile ranks and nearest neighbours in the model's feature space, built on the first peer lookup"""
+        if self.source is None:
+            raise ValueError('Processed attendance data is not available')
+        scorer = model_store.get()
+        with span('peer_index'):
+            return PeerIndex(self.source, scorer.scaler, scorer.medians)
+
+
+class EmployeeStore:
+    """Process-wide employee cache that rebuilds when the processed data changes
+
+    Data comes from the current run of the artifact registry (or the legacy
+    data/ directory). The binary snapshot written by the training pipeline is
+    preferred, the CSV is used when there is no snapshot or the CSV has been
+    modified since. The monthly series and trends come from the attendance
+    history, so the snapshot is also rebuilt when a period is recorded.
+
+    Data is only ever read from the directory the signature points to, so
+    it always matches the cluster labels next to it. When neither of its
+    files can be read, the previous snapshot is kept until the data changes
+    again (mock data on a cold start).
+    """
+
+    def __init__(self, registry, history=None):
+        self.registry = registry
+        self.history = history
+        self._snapshot = None
+        # Signature whose data could not be read, not retried until it changes
+        self._failed_signature = None
+        self._lock = threading.Lock()
+
+    def _locate(self):
+        """Return (signature, labels path) of the current data
+
+        The signature identifies the data file and its version by path, mtime
+        and size. The labels file's mtime is included so data and cluster
+        labels rewritten one after the other (legacy layout) end up together,
+        followed by the history version"""
+        artifacts = self.registry.locate()
+        labels_path = os.path.join(artifacts.models_dir, LABELS_FILE)
+        candidates = []
+        for name in (SNAPSHOT_FILE, DATA_FILE):
+            path = os.path.join(artifacts.data_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            candidates.append((path, stat.st_mtime_ns, stat.st_size))
+        if not candidates:
+            return None, labels_path
+        try:
+            labels_mtime = os.stat(labels_path).st_mtime_ns
+        except OSError:
+            labels_mtime = 0
+        history_version = self.history.version() if self.history else 0
+        # Newest file wins, the snapshot on ties since it is listed first
+        return max(candidates, key=lambda candidate: candidate[1]) + (labels_mtime, history_version), labels_path
+
+    @staticmethod
+    def _read(path):
+        """Processed data at path, else the other format in the same directory; None if neither loads"""
+        source = read_processed_attendance(path)
+        if source is None:
+            directory, name = os.path.split(path)
+            other = os.path.join(directory, DATA_FILE if name == SNAPSHOT_FILE else SNAPSHOT_FILE)
+            if os.path.exists(other):
+                source = read_processed_attendance(other)
+        return source
+
+    def get(self):
+        """Return the current snapshot, rebuilding it if the data has changed"""
+        signature, labels_path = self._locate()
+        snapshot = self._snapshot
+        hit = snapshot is not None and signature in (snapshot.signature, self._failed_signature)
+        record_cache('employee_snapshot', hit)
+        if hit:
+            return snapshot
+
+        # While another thread rebuilds, keep serving the previous snapshot instead of blocking
+        if snapshot is not None and not self._lock.acquire(blocking=False):
+            return snapshot
+        if snapshot is None:
+            self._lock.acquire()
+        try:
+            # Another thread may have rebuilt while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is None or signature not in (snapshot.signature, self._failed_signature):
+                with span('data_load'):
+                    source = self._read(signature[0]) if signature else None
+                    labels = load_labels(labels_path)
+                    rollups = self.history.rollups() if self.history else None
+                if source is None and snapshot is not None:
+                    print(f"Keeping the previous employee data, {signature and signature[0]} could not be read")
+                    self._failed_signature = signature
+                    return snapshot
+                with span('transform'):
+                    if source is None:
+                        employees = fallback_employees()
+                    else:
+                        employees = load_attendance_data(source, labels, rollups)
+                snapshot = EmployeeSnapshot(employees, signature, source, labels)
+                # Single reference assignment, readers see either the old or new snapshot
+                self._snapshot = snapshot
+        finally:
+            self._lock.release()
+        return snapshot
+
+
+class ModelStore:
+    """Process-wide cluster scorer, loaded on first use and reloaded when a new model is published"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._scorer = None
+        self._signature_loaded = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        """Model directory and the mtimes of its files, None for missing ones"""
+        models_dir = self.registry.locate().models_dir
+        signature = [models_dir]
+        for name in MODEL_FILES:
+            try:
+                signature.append(os.stat(os.path.join(models_dir, name)).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self):
+        """Return the current scorer; raises if the model cannot be loaded"""
+        signature = self._signature()
+        hit = self._scorer is not None and self._signature_loaded == signature
+        record_cache('model', hit)
+        if hit:
+            return self._scorer
+
+        with self._lock:
+            if self._scorer is None or self._signature_loaded != signature:
+                with span('model_load'):
+                    self._scorer = ClusterScorer.load(signature[0])
+                self._signature_loaded = signature
+        return self._scorer
+
+
+artifact_registry = ArtifactRegistry(ARTIFACTS_ROOT, os.path.dirname(CSV_PATH), MODELS_DIR)
+
+# Per-employee metrics of every recorded period, appended by each training and delta run
+history_store = HistoryStore(artifact_registry.history_dir)
+
+employee_store = EmployeeStore(artifact_registry, history_store)
+
+model_store = ModelStore(artifact_registry)
+
+# Recommendations pre-generated by generate_recommendations.py
+recommendation_store = RecommendationStore(RECOMMENDATIONS_DB_PATH)
+
+request_profiler = RequestProfiler(PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILER)
+
+
+def preload():
+    """Build the employee snapshot, everything derived from it and the scorer up front
+
+    gunicorn.conf.py calls this in the master process before the workers are
+    forked, so all workers share one copy (copy-on-write) instead of each
+    building its own on its first requests"""
+    snapshot = employee_store.get()
+    for name in ('frame', 'summary_json', 'peer_averages'):
+        getattr(snapshot, name)
+    # The cached response bodies and their compressed variants, built by the views themselves
+    for url in PRELOAD_URLS:
+        for encoding in (None,) + available_encodings():
+            with app.test_request_context(url, headers={'Accept-Encoding': encoding or 'identity'}):
+                app.dispatch_request()
+    try:
+        model_store.get()
+        snapshot.peer_index
+    except Exception as e:
+        print(f"Clustering model not preloaded: {e}")
+    return snapshot
+
+
+@app.before_request
+def start_request_timer():
+    """Start timing the request, and profiling it when it is sampled"""
+    g.request_start = time.perf_counter()
+    g.profiler = request_profiler.start()
+
+@app.after_request
+def record_request_duration(response):
+    """Record the request latency under its route pattern (not the raw path, which would explode the label set)"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_DURATION.observe(time.perf_counter() - start, request.method, route, str(response.status_code))
+    return response
+
+@app.teardown_request
+def write_request_profile(exc):
+    """Write the profile of a sampled request; runs even when the request failed"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_profiler.stop(profiler, f'{request.method} {route}')
+
+
+def int_arg(name, default, minimum=None, maximum=None):
+    """Read an integer query parameter, clamped to maximum; raises ValueError if invalid"""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}")
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+def snapshot_etag(snapshot, *parts):
+    """ETag for a response that depends only on the data snapshot and the given request parts"""
+    digest = hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:16]
+    return f'{snapshot.version}-{digest}'
+
+def query_key():
+    """Canonical form of the query string, so parameter order does not change the ETag"""
+    return urlencode(sorted(request.args.items(multi=True)))
+
+def matching_etag(snapshot, etag):
+    """The validator the client sent that is still current (any encoding of etag), else None"""
+    if request.if_none_match:
+        return next((tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)), None)
+    # If-Modified-Since only counts without If-None-Match
+    if request.if_modified_since and snapshot.last_modified and snapshot.last_modified <= request.if_modified_since:
+        return etag
+    return None
+
+def cached_response(snapshot, etag, build, cache_key=None):
+    """JSON response with validators, compression and Cache-Control
+
+    A request whose If-None-Match (or If-Modified-Since) is still current
+    gets a 304 before build() runs. build returns (body bytes, extra headers).
+    With cache_key the body and its compressed variants are kept on the
+    snapshot, so repeated requests cost neither serialization nor compression"""
+    current = matching_etag(snapshot, etag)
+    # A hit is a request answered from the client's own cache with a 304
+    record_cache('conditional_get', current is not None)
+    if current is not None:
+        response = app.response_class(status=304)
+        response.set_etag(current)
+    else:
+        if cache_key:
+            body, headers = snapshot.body(cache_key, build)
+        else:
+            with span('build_response'):
+                body, headers = build()
+        encoding = choose_encoding(request.accept_encodings, len(body))
+        if encoding and cache_key:
+            body = snapshot.compressed(cache_key, body, encoding)
+        elif encoding:
+            with span('compress'):
+                body = compress(body, encoding)
+        response = app.response_class(body, mimetype=app.json.mimetype, headers=headers)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag + ETAG_SUFFIXES[encoding])
+
+    response.headers['Cache-Control'] = API_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    if snapshot.last_modified:
+        response.last_modified = snapshot.last_modified
+    return response
 
 @app.route('/')
 def index():
@@ -145,99 +617,172 @@ def employee_view():
 
 @app.route('/api/employees')
 def get_employees():
-    """API endpoint to get all employee data"""
-    employees = load_attendance_data()
-    return jsonify(employees)
+    """API endpoint to get employee data, optionally filtered, sorted, paged and projected"""
+    snapshot = employee_store.get()
+    if QUERY_PARAMS.isdisjoint(request.args):
+        return cached_response(snapshot, snapshot_etag(snapshot, 'employees'),
+                               lambda: (snapshot.employees_json.encode(), {}), cache_key='employees')
+
+    def build():
+        total, employees, next_cursor = query_employees(snapshot, request.args)
+        headers = {'X-Total-Count': str(total)}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+        return jsonify(employees).get_data(), headers
+
+    try:
+        return cached_response(snapshot, snapshot_etag(snapshot, 'employees', query_key()), build)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/employee/<employee_id>')
 def get_employee(employee_id):
     """API endpoint to get specific employee data"""
-    employees = load_attendance_data()
-    employee = next((emp for emp in employees if emp['id'] == employee_id), None)
+    snapshot = employee_store.get()
+    employee = snapshot.by_id.get(employee_id)
     if employee:
-        return jsonify(employee)
+        return cached_response(snapshot, snapshot_etag(snapshot, 'employee', employee_id),
+                               lambda: (jsonify(employee).get_data(), {}))
     return jsonify({'error': 'Employee not found'}), 404
 
+def history_record(record):
+    """Website fields of one recorded period of an employee (see build_employee_columns)"""
+    def number(value):
+        value = float(value)
+        return round(value, 1) if value == value else None
+    def percent(value):
+        value = float(to_percent(float(value)))
+        return int(value) if value == value else None
+    absenteeism = float(record['absenteeism_days'])
+    return {
+        'period': record['period'],
+        'efficiency': percent(record['efficiency']),
+        'attendance': int(np.clip(100 - absenteeism * 2, 0, 100)) if absenteeism == absenteeism else 100,
+        'punctuality': percent(record['punctuality']),
+        'bayHours': number(record['bay_hours']),
+        'officeHours': number(record['avg_office_hours']),
+        'breakHours': number(record['avg_break_hours']),
+        'oooHours': number(record['avg_ooo_hours']),
+        'burnoutHours': number(record['burnout_hours']),
+        'clusterType': record['Behavior_Type']
+    }
+
+def rolling_summary(rollup):
+    """Precomputed rolling means of an employee, efficiency and punctuality in percent"""
+    if rollup is None:
+        return None
+    summary = {'periods': int(rollup['periods'])}
+    for metric in ROLLING_METRICS:
+        for size in (SHORT_WINDOW, ROLLING_WINDOW):
+            value = float(rollup[f'{metric}_mean_{size}'])
+            if metric != 'absenteeism_days':
+                value = float(to_percent(value))
+            summary[f'{metric}_mean_{size}'] = round(value, 1) if value == value else None
+    return summary
+
+@app.route('/api/employee/<employee_id>/history')
+def get_employee_history(employee_id):
+    """API endpoint to get an employee's recorded metrics for the periods from..to (YYYY-MM, inclusive)"""
+    start, end = request.args.get('from') or None, request.args.get('to') or None
+    try:
+        for period in (start, end):
+            if period is not None:
+                check_period(period)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshot = employee_store.get()
+    # Former employees are only in the history
+    if employee_id not in snapshot.by_id and not history_store.query(employee_id):
+        return jsonify({'error': 'Employee not found'}), 404
+
+    def build():
+        records = history_store.query(employee_id, start, end)
+        return jsonify({
+            'id': employee_id,
+            'from': start,
+            'to': end,
+            'history': [history_record(record) for record in records],
+            'rolling': rolling_summary(history_store.rollup(employee_id))
+        }).get_data(), {}
+
+    return cached_response(snapshot, snapshot_etag(snapshot, 'history', employee_id, start or '', end or ''), build)
+
+@app.route('/api/employee/<employee_id>/peers')
+def get_employee_peers(employee_id):
+    """API endpoint to get an employee's percentile ranks among its peers and the k most similar employees"""
+    try:
+        k = int_arg('k', DEFAULT_NEIGHBOURS, minimum=1, maximum=MAX_NEIGHBOURS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshot = employee_store.get()
+    if employee_id not in snapshot.by_id:
+        return jsonify({'error': 'Employee not found'}), 404
+
+    def build():
+        peers = snapshot.peer_index.peers(employee_id, k)
+        for similar in peers['similar']:
+            employee = snapshot.by_id.get(similar['id'], {})
+            for field in ('name', 'designation', 'clusterType', 'efficiency'):
+                similar[field] = employee.get(field)
+        return jsonify(peers).get_data(), {}
+
+    try:
+        return cached_response(snapshot, snapshot_etag(snapshot, 'peers', employee_id, str(k)), build)
+    except Exception as e:
+        print(f"Error building peer index: {e}")
+        return jsonify({'error': 'Peer comparison is not available'}), 503
+
+@app.route('/api/dashboard/summary')
+def get_dashboard_summary():
+    """API endpoint to get the aggregates behind the dashboard widgets, optionally filtered"""
+    snapshot = employee_store.get()
+    if QUERY_PARAMS.isdisjoint(request.args):
+        return cached_response(snapshot, snapshot_etag(snapshot, 'summary'),
+                               lambda: (snapshot.summary_json.encode(), {}), cache_key='summary')
+
+    # Filtered summaries are computed on demand from the columnar snapshot
+    def build():
+        mask = filter_mask(snapshot.frame, request.args)
+        return jsonify(build_dashboard_summary(snapshot.frame[mask].reset_index(drop=True))).get_data(), {}
+
+    try:
+        return cached_response(snapshot, snapshot_etag(snapshot, 'summary', query_key()), build)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/search_employee')
 def search_employee():
-    """API endpoint to search employees by ID or name"""
+    """API endpoint to search employees by ID, name or designation, ranked and paged"""
     query = request.args.get('q', '').lower()
-    employees = load_attendance_data()
     
     if not query:
         return jsonify({'error': 'Query parameter required'}), 400
     
-    # Search by ID or name
-    matching_employees = []
-    for emp in employees:
-        if (query in emp['id'].lower() or 
-            query in emp['name'].lower() or 
-            query in emp['designation'].lower() or
-            query == emp['id'].lower()):  # Exact ID match
-            matching_employees.append(emp)
+    try:
+        limit = int_arg('limit', SEARCH_DEFAULT_LIMIT, minimum=1, maximum=SEARCH_MAX_LIMIT)
+        offset = int_arg('offset', 0, minimum=0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    snapshot = employee_store.get()
+    
+    def build():
+        # Exact ID match first, then prefix matches, then substring matches
+        total, matching_employees = snapshot.search_index.search(query, limit, offset)
+        return jsonify(matching_employees).get_data(), {'X-Total-Count': str(total)}
     
-    return jsonify(matching_employees)
+    return cached_response(snapshot, snapshot_etag(snapshot, 'search', query, str(limit), str(offset)), build)
 
 @app.route('/api/organization_data')
 def get_organization_data():
     """API endpoint to get organization-level aggregated data"""
     try:
-        # Use absolute path for Vercel compatibility
-        csv_path = os.path.join(os.path.dirname(__file__), 'data', 'processed_attendance.csv')
-        df = pd.read_csv(csv_path)
-        
-        # Group by department (using a combination of designation and account code)
-        department_data = []
-        
-        # Group by designation for department-level analysis
-        grouped = df.groupby(['Designation', 'Account_code']).agg({
-            'Fake_Id': 'count',  # Employee count
-            'efficiency': 'mean',
-            'punctuality': 'mean',
-            'bay_hours': 'mean',
-            'absenteeism_days': 'mean',
-            'Cluster': 'mode'
-        }).reset_index()
-        
-        for _, row in grouped.iterrows():
-            # Calculate department name based on designation
-            dept_name = {
-                'AL': 'Management',
-                'TDS': 'Technical Delivery',
-                'SSE': 'Senior Engineering',
-                'SE': 'Software Engineering'
-            }.get(row['Designation'], 'Other')
-            
-            efficiency = float(row['efficiency'])
-            if efficiency <= 1:
-                efficiency = efficiency * 100
-                
-            punctuality = float(row['punctuality'])
-            if punctuality <= 1:
-                punctuality = punctuality * 100
-            
-            # Calculate attendance rate
-            attendance = max(0, min(100, 100 - (float(row['absenteeism_days']) * 2)))
-            
-            # Determine burnout risk
-            burnout_risk = 'Low'
-            if efficiency < 60 or attendance < 85:
-                burnout_risk = 'High'
-            elif efficiency < 75 or attendance < 90:
-                burnout_risk = 'Medium'
-            
-            dept_data = {
-                'name': f"{dept_name} ({row['Account_code']})",
-                'accountCode': row['Account_code'],
-                'designation': row['Designation'],
-                'employees': int(row['Fake_Id']),
-                'efficiency': int(efficiency),
-                'attendance': int(attendance),
-                'burnoutRisk': burnout_risk
-            }
-            department_data.append(dept_data)
-        
-        return jsonify(department_data)
+        # Grouped by department (designation and account code), memoized per data snapshot
+        snapshot = employee_store.get()
+        return cached_response(snapshot, snapshot_etag(snapshot, 'organization'),
+                               lambda: (snapshot.organization_json.encode(), {}), cache_key='organization')
         
     except Exception as e:
         print(f"Error loading organization data: {e}")
@@ -247,24 +792,81 @@ def get_organization_data():
             {'name': 'HR (TM)', 'accountCode': 'TM', 'designation': 'AL', 'employees': 12, 'efficiency': 92, 'attendance': 98, 'burnoutRisk': 'Low'}
         ])
 
+@app.route('/api/score', methods=['POST'])
+def score_records():
+    """API endpoint to assign raw attendance records (one object or a list) to behavior clusters"""
+    payload = request.get_json(silent=True)
+    records = payload if isinstance(payload, list) else [payload]
+    if not records or not all(isinstance(record, dict) for record in records):
+        return jsonify({'error': 'Expected a JSON object or a list of objects'}), 400
+    if len(records) > SCORE_MAX_RECORDS:
+        return jsonify({'error': f'At most {SCORE_MAX_RECORDS} records per request'}), 400
+    
+    try:
+        scorer = model_store.get()
+    except Exception as e:
+        print(f"Error loading clustering model: {e}")
+        return jsonify({'error': 'Clustering model is not available'}), 503
+    
+    try:
+        results = scorer.score(records)
+    except ScoringError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(results if isinstance(payload, list) else results[0])
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics of this process: request latencies, timed sections and cache hit/miss counts"""
+    return app.response_class(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+def recommendations_response(recommendations):
+    """JSON response with an ETag, answering If-None-Match with 304"""
+    response = jsonify(recommendations)
+    response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+    return response.make_conditional(request)
+
 @app.route('/api/recommendations/<employee_id>')
 def get_recommendations(employee_id):
     """API endpoint to get personalized recommendations for an employee"""
     try:
         # Get employee data
-        employees = load_attendance_data()
-        employee = next((emp for emp in employees if emp['id'] == employee_id), None)
+        employee = employee_store.get().by_id.get(employee_id)
         
         if not employee:
             return jsonify({'error': 'Employee not found'}), 404
         
-        # Integrate with Gemini API for AI-powered recommendations
+        # Serve recommendations pre-generated by generate_recommendations.py while their inputs still match
+        inputs = recommendation_inputs(employee)
+        stored = recommendation_store.get(employee_id)
+        stored_hit = bool(stored) and stored[0] == inputs_digest(inputs)
+        record_cache('recommendation_store', stored_hit)
+        if stored_hit:
+            return recommendations_response(stored[1])
+        
+        # ?wait=<seconds> bounds how long to block on the Gemini call, wait=0 never blocks
+        try:
+            wait = float(request.args.get('wait', RECOMMENDATION_WAIT_SECONDS))
+        except ValueError:
+            return jsonify({'error': "'wait' must be a number of seconds"}), 400
+        
+        # Integrate with Gemini API for AI-powered recommendations (cached and coalesced)
         try:
-            gemini_recommendations = call_gemini_api(employee)
-            if gemini_recommendations:
-                return jsonify(gemini_recommendations)
+            status, _, gemini_recommendations = recommendation_service.get(employee, wait=max(0, wait))
         except Exception as e:
             print(f"Gemini API call failed: {e}")
+            status, gemini_recommendations = READY, None
+        
+        if status == PENDING:
+            # Still generating, the client polls the same URL until it gets the result
+            response = jsonify({'status': 'pending'})
+            response.status_code = 202
+            response.headers['Retry-After'] = '2'
+            response.headers['Location'] = url_for('get_recommendations', employee_id=employee_id, wait=0)
+            return response
+        
+        if gemini_recommendations:
+            return recommendations_response(gemini_recommendations)
         
         # Return empty to trigger client-side intelligent recommendations as fallback
         return jsonify([]), 204
@@ -286,7 +888,7 @@ def generate_llm_recommendations(behavior_type, metrics, cluster_avg=None):
         return "❌ API key not configured. Please set GEMINI_API_KEY environment variable."
 
     # Gemini model endpoint - Using 'gemini-2.0-flash-exp' for structured output
-    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+    url = GEMINI_API_URL
 
     # Build dynamic, context-rich prompt
     emp_lines = "\n".join([f"- {k.replace('_',' ').title()}: {v}" for k, v in metrics.items()])
@@ -340,7 +942,8 @@ def generate_llm_recommendations(behavior_type, metrics, cluster_avg=None):
 
     # Send request to Gemini
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=20)
+        with span('llm_call'):
+            response = gemini_session.post(url, headers=headers, json=data, timeout=20)
         response.raise_for_status()
         result = response.json()
 
@@ -354,31 +957,59 @@ def generate_llm_recommendations(behavior_type, metrics, cluster_avg=None):
     except Exception as e:
         return f"❌ Gemini API Error: {str(e)}"
 
-def call_gemini_api(employee_data):
+def recommendation_metrics(employee_data):
+    """Employee metrics that go into the recommendations prompt"""
+    return {
+        'efficiency': f"{employee_data.get('efficiency', 0)}%",
+        'attendance': f"{employee_data.get('attendance', 0)}%",
+        'bay_hours': f"{employee_data.get('bayHours', 0)} hrs/day",
+        'punctuality': f"{employee_data.get('punctuality', 0)}%",
+        'designation': employee_data.get('designation', 'Unknown'),
+        'performance_score': employee_data.get('score', 0)
+    }
+
+def peer_averages(frame):
+    """Average prompt metrics per behavior cluster, formatted like recommendation_metrics()"""
+    if frame.empty or 'clusterType' not in frame:
+        return {}
+    # Missing values are skipped, a cluster without any counts as 0 like in the dashboard
+    means = frame.groupby('clusterType')[['efficiency', 'attendance', 'bayHours', 'punctuality']].mean().fillna(0)
+    return {
+        cluster_type: {
+            'efficiency': f"{round(row['efficiency'])}%",
+            'attendance': f"{round(row['attendance'])}%",
+            'bay_hours': f"{row['bayHours']:.1f} hrs/day",
+            'punctuality': f"{round(row['punctuality'])}%"
+        }
+        for cluster_type, row in means.iterrows()
+    }
+
+def cluster_averages_for(employee_data):
+    """Peer-group averages of the employee's behavior cluster in the current data snapshot"""
+    return employee_store.get().peer_averages.get(employee_data.get('clusterType'))
+
+def recommendation_inputs(employee_data):
+    """The employee's own prompt inputs, used to key cached and stored results
+
+    The cluster's peer averages also go into the prompt but not into the key:
+    a retrain that moves a cluster's averages must not invalidate the
+    recommendations of every employee in it whose own metrics are unchanged"""
+    return {
+        'behavior_type': employee_data.get('clusterType', 'Unknown'),
+        'metrics': recommendation_metrics(employee_data)
+    }
+
+def call_gemini_api(employee_data, cluster_avg=None):
     """
-    Function to call Gemini API for generating personalized recommendations
+    Function to call Gemini API for generating personalized recommendations,
+    comparing the employee against the given cluster averages (peer group)
     """
     try:
         # Prepare metrics dictionary from employee data
-        metrics = {
-            'efficiency': f"{employee_data.get('efficiency', 0)}%",
-            'attendance': f"{employee_data.get('attendance', 0)}%",
-            'bay_hours': f"{employee_data.get('bayHours', 0)} hrs/day",
-            'punctuality': f"{employee_data.get('punctuality', 0)}%",
-            'designation': employee_data.get('designation', 'Unknown'),
-            'performance_score': employee_data.get('score', 0)
-        }
+        metrics = recommendation_metrics(employee_data)
         
         behavior_type = employee_data.get('clusterType', 'Unknown')
         
-        # Get cluster averages (simplified for now)
-        cluster_avg = {
-            'efficiency': '85%',
-            'attendance': '90%',
-            'bay_hours': '7.5 hrs/day',
-            'punctuality': '88%'
-        }
-        
         # Call the LLM recommendations function
         raw_recommendations = generate_llm_recommendations(behavior_type, metrics, cluster_avg)
         
@@ -471,6 +1102,15 @@ def parse_gemini_text_to_json(text_response):
         print(f"Error parsing Gemini response: {e}")
         return None
 
+# Shared by all request threads: caches parsed results, merges concurrent requests for the
+# same inputs and caps the number of Gemini calls in flight
+recommendation_service = RecommendationService(
+    lambda employee: call_gemini_api(employee, cluster_averages_for(employee)),
+    recommendation_inputs,
+    max_concurrent=int(os.environ.get('GEMINI_MAX_CONCURRENCY', 4)),
+    ttl=int(os.environ.get('RECOMMENDATION_CACHE_TTL', 6 * 3600))
+)
+
 @app.route('/organisation-view.html')
 def organisation_view():
     """Redirect to employee view since organization view is now integrated"""
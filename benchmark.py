@@ -0,0 +1,226 @@
+# benchmark.py
+# Times the pipeline and the API on synthetic attendance data and writes a JSON baseline:
+#   python benchmark.py --output benchmarks/baseline.json
+#   python benchmark.py --compare benchmarks/baseline.json   # writes benchmarks/results.json, exits 1 on a regression
+#   python benchmark.py --sizes 1000000                      # needs ~8 GB of memory
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import app
+from src.artifact_registry import DATA_FILE, SNAPSHOT_FILE, ArtifactRegistry, write_json
+from src.attendance_snapshot import save_snapshot
+from src.cluster_labels import assign_labels
+from src.clustering_model import run_clustering, save_model
+from src.data_preprocessing import preprocess_attendance
+from src.synthetic_attendance import generate_attendance, write_attendance
+
+DEFAULT_SIZES = '10000,100000'
+DATA_DIR = os.path.join('benchmarks', 'data')
+OUTPUT_PATH = os.path.join('benchmarks', 'baseline.json')
+# Default output with --compare, so the run never replaces the baseline it is compared with
+RESULTS_PATH = os.path.join('benchmarks', 'results.json')
+
+# A benchmark more than this much slower than the baseline counts as a regression
+TOLERANCE = 1.25
+
+# Raw records per /api/score request
+SCORE_BATCH = 100
+
+
+def measure(function, repeat):
+    """Run function once under tracemalloc for its peak memory (and as a warm-up), then repeat times for its timing.
+
+    Returns (result of the last run, {'seconds', 'best_seconds', 'peak_memory_mb'}).
+    The peak covers Python and NumPy allocations, not native buffers such as
+    those of the CSV parser; max_rss_mb in the results has the process total.
+    """
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, {
+        'seconds': statistics.median(timings),
+        'best_seconds': min(timings),
+        'peak_memory_mb': peak / 2**20
+    }
+
+
+def synthetic_export(rows, seed, data_dir=DATA_DIR):
+    """Path of the synthetic raw export for rows and seed, generated on first use."""
+    path = os.path.join(data_dir, f'attendance_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        write_attendance(generate_attendance(rows, seed), path)
+    return path
+
+
+def api_routes(snapshot, raw):
+    """(name, method, url, json body) of the API requests to time."""
+    employee_id = snapshot.employees[len(snapshot.employees) // 2]['id']
+    records = json.loads(raw.head(SCORE_BATCH).to_json(orient='records'))
+    return [
+        ('GET /api/employees', 'GET', '/api/employees', None),
+        ('GET /api/employees?query', 'GET', '/api/employees?designation=TDS&sort=-efficiency&limit=50', None),
+        ('GET /api/employee/<id>', 'GET', f'/api/employee/{employee_id}', None),
+        ('GET /api/dashboard/summary', 'GET', '/api/dashboard/summary', None),
+        ('GET /api/search_employee', 'GET', f'/api/search_employee?q={employee_id[:2]}', None),
+        ('GET /api/organization_data', 'GET', '/api/organization_data', None),
+        (f'POST /api/score ({SCORE_BATCH} records)', 'POST', '/api/score', records)
+    ]
+
+
+def bench_size(rows, seed, repeat, requests):
+    """Benchmarks for one data size: {name: measurements}."""
+    path = synthetic_export(rows, seed)
+    results = {}
+
+    (df, X_scaled, scaler, features), results['preprocess_attendance'] = measure(
+        lambda: preprocess_attendance(path), repeat)
+    (df, model), results['run_clustering'] = measure(
+        lambda: run_clustering(df.copy(), X_scaled, 4, scaler, save=False), repeat)
+    labels = assign_labels(model.cluster_centers_, scaler)
+    _, results['load_attendance_data'] = measure(lambda: app.load_attendance_data(df, labels), repeat)
+    for name in ('preprocess_attendance', 'run_clustering', 'load_attendance_data'):
+        results[name]['rows_per_second'] = rows / results[name]['seconds']
+
+    with tempfile.TemporaryDirectory() as root:
+        # Serve the clustered data and model from a throwaway legacy layout
+        data_dir, models_dir = os.path.join(root, 'data'), os.path.join(root, 'models')
+        os.makedirs(data_dir)
+        os.makedirs(models_dir)
+        df.to_csv(os.path.join(data_dir, DATA_FILE), index=False)
+        save_snapshot(df, os.path.join(data_dir, SNAPSHOT_FILE))
+        save_model(model, scaler, labels, df[features].median(), models_dir)
+        registry = ArtifactRegistry(os.path.join(root, 'artifacts'), data_dir, models_dir)
+        app.employee_store = app.EmployeeStore(registry)
+        app.model_store = app.ModelStore(registry)
+
+        # Cold start: the first request loads the data and builds the snapshot
+        def cold_snapshot():
+            app.employee_store = app.EmployeeStore(registry)
+            return app.employee_store.get()
+        snapshot, results['employee_snapshot (cold)'] = measure(cold_snapshot, repeat)
+        results['employee_snapshot (cold)']['rows_per_second'] = rows / results['employee_snapshot (cold)']['seconds']
+
+        client = app.app.test_client()
+        for name, method, url, body in api_routes(snapshot, pd.read_csv(path, nrows=SCORE_BATCH)):
+            def batch():
+                for _ in range(requests):
+                    response = client.open(url, method=method, json=body)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{name} returned {response.status_code}")
+            _, results[name] = measure(batch, repeat)
+            results[name]['requests_per_second'] = requests / results[name]['seconds']
+            results[name]['seconds'] /= requests
+            results[name]['best_seconds'] /= requests
+    return results
+
+
+def max_rss_mb():
+    """Peak resident memory of this process so far, None where it cannot be read."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lines describing the benchmarks slower than tolerance times their baseline."""
+    regressions = []
+    for size, benchmarks in results['sizes'].items():
+        for name, measurements in benchmarks.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(name)
+            if previous and measurements['seconds'] > previous['seconds'] * tolerance:
+                regressions.append(f"{name} @ {size} rows: {previous['seconds']:.4g}s -> "
+                                   f"{measurements['seconds']:.4g}s "
+                                   f"({measurements['seconds'] / previous['seconds']:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attendance pipeline and API on synthetic data")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated row counts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark (the median is reported)')
+    parser.add_argument('--requests', type=int, default=50, help='requests per timed run of an API route')
+    parser.add_argument('--output', help=f'JSON file to write the results to (default: {OUTPUT_PATH}, '
+                                         f'or {RESULTS_PATH} with --compare)')
+    parser.add_argument('--compare', metavar='BASELINE', help='fail if slower than this earlier result file')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='slowdown factor that counts as a regression')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = RESULTS_PATH if args.compare else OUTPUT_PATH
+    # Load the baseline before anything is written, and never overwrite it with the run it is compared with
+    baseline = None
+    if args.compare:
+        if os.path.abspath(args.output) == os.path.abspath(args.compare):
+            parser.error("--output must differ from --compare, the baseline would be overwritten")
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {**environment(), 'repeat': args.repeat, 'requests': args.requests, 'sizes': {}}
+    for rows in (int(size) for size in args.sizes.split(',')):
+        print(f"⏱️ {rows} rows")
+        results['sizes'][str(rows)] = benchmarks = bench_size(rows, args.seed, args.repeat, args.requests)
+        for name, measurements in benchmarks.items():
+            rate = measurements.get('rows_per_second') or measurements.get('requests_per_second')
+            unit = 'rows/s' if 'rows_per_second' in measurements else 'req/s'
+            print(f"  {name:<36} {measurements['seconds'] * 1000:10.2f} ms  {rate:12,.0f} {unit}"
+                  f"  peak {measurements['peak_memory_mb']:8.1f} MB")
+
+    results['max_rss_mb'] = max_rss_mb()
+    write_json(results, args.output)
+    print(f"✅ Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# generate_recommendations.py
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app import (
+    RECOMMENDATIONS_DB_PATH, call_gemini_api, employee_store, recommendation_inputs
+)
+from src.recommendation_service import inputs_digest
+from src.recommendation_store import RecommendationStore
+
+
+def generate_with_retry(employee, cluster_avg, attempts, backoff):
+    """Call Gemini, retrying failed calls with exponential backoff and jitter."""
+    for attempt in range(attempts):
+        recommendations = call_gemini_api(employee, cluster_avg)
+        if recommendations:
+            return recommendations
+        if attempt < attempts - 1:
+            time.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate Gemini recommendations for all employees")
+    parser.add_argument('--all', action='store_true',
+                        help="regenerate every employee, not only those whose metrics changed")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent Gemini calls")
+    parser.add_argument('--attempts', type=int, default=3, help="tries per employee")
+    parser.add_argument('--backoff', type=float, default=2.0, help="initial retry delay in seconds")
+    parser.add_argument('--db', default=RECOMMENDATIONS_DB_PATH)
+    args = parser.parse_args()
+
+    if not os.getenv('GEMINI_API_KEY'):
+        raise SystemExit("❌ GEMINI_API_KEY is not set")
+
+    snapshot = employee_store.get()
+    store = RecommendationStore(args.db)
+    connection = store.open_writer()
+    stored = {} if args.all else store.digests(connection)
+
+    # Real peer averages per behavior cluster, and only employees whose own metrics changed
+    pending = []
+    for employee in snapshot.employees:
+        cluster_avg = snapshot.peer_averages.get(employee.get('clusterType'))
+        digest = inputs_digest(recommendation_inputs(employee))
+        if stored.get(employee['id']) != digest:
+            pending.append((employee, cluster_avg, digest))
+
+    print(f"🔧 {len(pending)} of {len(snapshot.employees)} employees need recommendations")
+
+    done, failed, batch = 0, 0, []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(generate_with_retry, employee, cluster_avg, args.attempts, args.backoff):
+                (employee['id'], digest)
+            for employee, cluster_avg, digest in pending
+        }
+        for future in as_completed(futures):
+            employee_id, digest = futures[future]
+            recommendations = future.result()
+            if not recommendations:
+                failed += 1
+                continue
+            batch.append((employee_id, digest, recommendations))
+            done += 1
+            # Writes stay on this thread, committed in batches
+            if len(batch) >= 50:
+                store.put_many(connection, batch)
+                batch = []
+                print(f"🚀 {done}/{len(pending)} generated")
+
+    store.put_many(connection, batch)
+    connection.close()
+    print(f"✅ Done: {done} generated, {failed} failed. Saved to {args.db}")
+
+
+if __name__ == '__main__':
+    main()
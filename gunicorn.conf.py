@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+# Production serving mode with several worker processes sharing one data snapshot:
+#   gunicorn -c gunicorn.conf.py app:app
+# The master imports the app and builds the employee snapshot, its derived data and the
+# cached response bodies once (preload_app + app.preload()), then forks the workers, which
+# share those pages copy-on-write instead of each holding its own copy. The numeric columns
+# of the binary snapshot are memory-mapped, so they stay shared through the page cache.
+# After a new run is published, `kill -HUP <master pid>` rebuilds the snapshot in the master
+# and replaces the workers; until then each worker rebuilds its own copy on its next request.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+# Threads per worker, so a request waiting on Gemini does not hold up the others
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+# Above the 25s /api/recommendations wait
+timeout = 60
+
+# No collections in the master while the snapshot is built, so the objects are packed
+# densely instead of leaving freed holes in pages the workers will share
+gc.disable()
+
+
+def share_snapshot():
+    import app
+    app.preload()
+    # Move everything built so far out of the collector's reach: a collection in a worker
+    # would otherwise write to every tracked object and unshare the pages they are on
+    gc.freeze()
+
+
+def when_ready(server):
+    # In the master, after the app is loaded and before the first worker is forked
+    share_snapshot()
+
+
+def on_reload(server):
+    share_snapshot()
+
+
+def post_fork(server, worker):
+    gc.enable()
@@ -0,0 +1,251 @@
+# src/artifact_registry.py
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+
+ARTIFACTS_ROOT = "artifacts"
+
+# File names inside a run directory (and the legacy data/ and models/ directories)
+DATA_FILE = 'processed_attendance.csv'
+SNAPSHOT_FILE = 'processed_attendance.npz'
+MODEL_FILE = 'kmeans_model.pkl'
+SCALER_FILE = 'scaler.pkl'
+LABELS_FILE = 'cluster_labels.json'
+MEDIANS_FILE = 'feature_medians.json'
+SCORES_FILE = 'kmeans_model.scores.json'
+REPORT_FILE = 'k_selection_report.json'
+
+MODEL_FILES = (MODEL_FILE, SCALER_FILE, LABELS_FILE, MEDIANS_FILE, SCORES_FILE, REPORT_FILE)
+
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'current'
+# Per-employee history across runs (src/history_store.py), kept when runs are pruned
+HISTORY_DIR = 'history'
+STAGING_PREFIX = '.staging-'
+
+# Published runs kept besides the current one, for rollback
+KEEP_RUNS = 5
+
+# Where the data and model files of the current version live; run_id is None for the legacy layout
+Artifacts = namedtuple('Artifacts', ['run_id', 'data_dir', 'models_dir'])
+
+
+def write_json(data, path):
+    """Write data as JSON, replacing path atomically."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_run_id():
+    """Sortable, unique run id: UTC timestamp plus a random suffix."""
+    return time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()) + '-' + uuid.uuid4().hex[:6]
+
+
+class RunBuilder:
+    """Staging directory for one run, published as a whole by publish().
+
+    Files are written into path; nothing is visible to readers until the
+    directory is renamed into place and the current pointer is flipped.
+    Used as a context manager, an unpublished run is discarded on exit.
+    """
+
+    def __init__(self, registry, run_id):
+        self.registry = registry
+        self.run_id = run_id
+        self.path = os.path.join(registry.runs_dir, STAGING_PREFIX + run_id)
+        self.published = False
+        os.makedirs(self.path)
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def add_file(self, source, name=None):
+        """Add an existing file to the run, hard-linked when possible since published files never change."""
+        target = self.file(name or os.path.basename(source))
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def publish(self, **manifest):
+        """Checksum the files, write the manifest, move the run into place and make it current."""
+        files = {}
+        for name in sorted(os.listdir(self.path)):
+            path = self.file(name)
+            files[name] = {'sha256': file_sha256(path), 'size': os.path.getsize(path)}
+        manifest = {
+            'run_id': self.run_id,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            **manifest,
+            'files': files
+        }
+        write_json(manifest, self.file(MANIFEST_FILE))
+
+        os.rename(self.path, self.registry.run_dir(self.run_id))
+        self.published = True
+        self.registry.set_current(self.run_id)
+        return manifest
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.published:
+            self.discard()
+
+
+class ArtifactRegistry:
+    """Versioned training runs under root/runs/<run id>, one of them current.
+
+    Each run directory holds the processed data, the model files and a
+    manifest (features, k, labels, row count, checksums). The current run is
+    named by root/current, which is replaced atomically, so a reader that
+    resolves it once sees data and model from the same run. Until a run is
+    published, locate() falls back to the legacy data/ and models/ paths.
+    """
+
+    def __init__(self, root=ARTIFACTS_ROOT, legacy_data_dir="data", legacy_models_dir="models"):
+        self.root = root
+        self.runs_dir = os.path.join(root, 'runs')
+        self.history_dir = os.path.join(root, HISTORY_DIR)
+        self.legacy = Artifacts(None, legacy_data_dir, legacy_models_dir)
+        self._pointer_stat = None
+        self._located = self.legacy
+
+    def run_dir(self, run_id):
+        return os.path.join(self.runs_dir, run_id)
+
+    def new_run(self):
+        os.makedirs(self.runs_dir, exist_ok=True)
+        return RunBuilder(self, new_run_id())
+
+    def current(self):
+        """Id of the current run, None when nothing has been published."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_current(self, run_id):
+        """Atomically point current at a published run."""
+        if not os.path.exists(os.path.join(self.run_dir(run_id), MANIFEST_FILE)):
+            raise ValueError(f"Unknown run {run_id}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(run_id + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def locate(self):
+        """Artifacts of the current run, or the legacy layout.
+
+        The pointer is only re-read when its file changes, so this is a
+        single stat() on the request path.
+        """
+        try:
+            stat = os.stat(os.path.join(self.root, CURRENT_FILE))
+            pointer_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pointer_stat = None
+        if pointer_stat != self._pointer_stat:
+            run_id = self.current() if pointer_stat else None
+            run_dir = self.run_dir(run_id) if run_id else None
+            self._located = Artifacts(run_id, run_dir, run_dir) if run_id else self.legacy
+            self._pointer_stat = pointer_stat
+        return self._located
+
+    def manifest(self, run_id):
+        with open(os.path.join(self.run_dir(run_id), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def runs(self):
+        """Published run ids, oldest first."""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.runs_dir)
+            if not name.startswith(STAGING_PREFIX)
+            and os.path.exists(os.path.join(self.run_dir(name), MANIFEST_FILE))
+        )
+
+    def verify(self, run_id):
+        """List the files of a run that are missing or do not match their manifest checksum."""
+        problems = []
+        for name, expected in self.manifest(run_id)['files'].items():
+            path = os.path.join(self.run_dir(run_id), name)
+            if not os.path.exists(path):
+                problems.append(f"{name}: missing")
+            elif file_sha256(path) != expected['sha256']:
+                problems.append(f"{name}: checksum mismatch")
+        return problems
+
+    def prune(self, keep=KEEP_RUNS):
+        """Delete all but the newest keep runs, never the current one."""
+        current = self.current()
+        for run_id in self.runs()[:-keep]:
+            if run_id != current:
+                shutil.rmtree(self.run_dir(run_id), ignore_errors=True)
+
+
+def run_manifest(model, scaler, labels, rows, **extra):
+    """Manifest fields describing a trained model and the data it labelled."""
+    return {
+        'features': list(scaler.feature_names_in_),
+        'k': int(model.n_clusters),
+        'labels': {str(cluster): entry['label'] for cluster, entry in labels.items()},
+        'rows': int(rows),
+        **extra
+    }
+
+
+if __name__ == '__main__':
+    # python -m src.artifact_registry [list | verify [run] | use <run>]
+    registry = ArtifactRegistry()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if command == 'list':
+        current = registry.current()
+        for run_id in registry.runs():
+            manifest = registry.manifest(run_id)
+            marker = '*' if run_id == current else ' '
+            print(f"{marker} {run_id}  k={manifest.get('k')}  rows={manifest.get('rows')}")
+    elif command == 'verify':
+        run_id = sys.argv[2] if len(sys.argv) > 2 else registry.current()
+        problems = registry.verify(run_id)
+        print('\n'.join(problems) if problems else f"✅ {run_id} matches its manifest")
+        sys.exit(1 if problems else 0)
+    elif command == 'use':
+        registry.set_current(sys.argv[2])
+        print(f"✅ Current run is now {sys.argv[2]}")
+    else:
+        sys.exit(f"Unknown command {command}, expected list, verify or use")
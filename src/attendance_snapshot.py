@@ -0,0 +1,164 @@
+# src/attendance_snapshot.py
+import json
+import os
+import struct
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_FORMAT = 'processed-attendance'
+SNAPSHOT_VERSION = 1
+
+META_KEY = 'meta'
+
+# Size of the fixed part of a zip local file header, followed by the name and extra field
+ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def snapshot_path_for(csv_path):
+    """Binary snapshot path stored next to a processed CSV."""
+    return os.path.splitext(csv_path)[0] + '.npz'
+
+
+def smallest_int_dtype(max_value):
+    """Narrowest signed integer dtype that can hold max_value."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def encode_column(series):
+    """Return (kind, arrays) for one column: numeric values or categorical codes."""
+    if pd.api.types.is_bool_dtype(series):
+        return 'numeric', {'values': series.to_numpy()}
+    if pd.api.types.is_integer_dtype(series):
+        return 'numeric', {'values': pd.to_numeric(series, downcast='integer').to_numpy()}
+    if pd.api.types.is_float_dtype(series):
+        return 'numeric', {'values': series.to_numpy(dtype=np.float64)}
+
+    # Text columns become integer codes into a sorted table of categories, -1 for missing
+    codes, categories = pd.factorize(series.astype(object), sort=True)
+    categories = np.asarray([str(value) for value in categories], dtype=str)
+    return 'categorical', {
+        'codes': codes.astype(smallest_int_dtype(len(categories))),
+        'categories': categories
+    }
+
+
+def save_snapshot(df, path):
+    """Write df as a typed, uncompressed .npz snapshot, replacing path atomically."""
+    write_snapshot([encode_column(df[name]) + (str(name),) for name in df.columns], len(df), path)
+
+
+def write_snapshot(columns, rows, path):
+    """Write already encoded columns, (kind, arrays, name) as from encode_column(), as a snapshot.
+
+    Arrays may be memory-mapped: np.savez copies them into the file in
+    buffered blocks, so columns larger than memory can be written.
+    """
+    arrays = {}
+    for index, (kind, encoded, name) in enumerate(columns):
+        for part, values in encoded.items():
+            arrays[f'{index}.{part}'] = values
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'rows': rows,
+        'columns': [{'name': name, 'kind': kind} for kind, _, name in columns]
+    }
+    arrays[META_KEY] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def memmap_member(path, info):
+    """Memory-map one stored (uncompressed) .npy member of an .npz file."""
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        header = f.read(ZIP_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if not shape or 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def read_arrays(path, mmap=True):
+    """Read every array of an .npz file, memory-mapping the uncompressed ones."""
+    if not mmap:
+        with np.load(path, allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = memmap_member(path, info)
+            else:
+                with zf.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+    return arrays
+
+
+def load_snapshot(path, mmap=True, columns=None):
+    """Load a snapshot written by save_snapshot as a DataFrame, optionally only the given columns.
+
+    Numeric columns keep their compact dtypes, categorical columns are
+    decoded to object columns with NaN for missing values, as read_csv
+    would return them. Numeric columns are not copied: with mmap they stay
+    read-only views of the file, whose pages every process that loads the
+    same snapshot shares through the page cache.
+    """
+    arrays = read_arrays(path, mmap=mmap)
+    meta = json.loads(bytes(arrays[META_KEY]).decode())
+    if meta.get('format') != SNAPSHOT_FORMAT or meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot {path}: {meta.get('format')} v{meta.get('version')}")
+
+    data = {}
+    for index, column in enumerate(meta['columns']):
+        if columns is not None and column['name'] not in columns:
+            continue
+        if column['kind'] == 'numeric':
+            # Plain ndarray views, pandas does not expect np.memmap subclasses
+            data[column['name']] = np.asarray(arrays[f'{index}.values'])
+        else:
+            codes = np.asarray(arrays[f'{index}.codes'])
+            categories = np.asarray(arrays[f'{index}.categories']).astype(object)
+            values = np.empty(len(codes), dtype=object)
+            values[:] = np.nan
+            present = codes >= 0
+            values[present] = categories[codes[present]]
+            data[column['name']] = values
+
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']), copy=False)
+
+
+if __name__ == '__main__':
+    # Convert an existing processed CSV: python -m src.attendance_snapshot data/processed_attendance.csv
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'data/processed_attendance.csv'
+    save_snapshot(pd.read_csv(csv_path), snapshot_path_for(csv_path))
+    print(f"Snapshot written to {snapshot_path_for(csv_path)}")
@@ -0,0 +1,125 @@
+# src/cluster_labels.py
+import json
+
+import numpy as np
+import pandas as pd
+
+LABELS_PATH = "models/cluster_labels.json"
+
+# A cluster's radius is this quantile of its training members' distances to the centroid
+RADIUS_QUANTILE = 0.95
+
+# Reference behavior profiles in unscaled feature units, taken from the centroids of the
+# hand-labelled model. display is the website cluster (1=Green ... 4=Red).
+REFERENCE_PROFILES = [
+    {
+        'label': 'Consistent Performer',
+        'display': 1,
+        'profile': {
+            'avg_in_time_hr': 12.05, 'avg_office_hours': 9.30, 'avg_break_hours': 1.84,
+            'avg_ooo_hours': 1.33, 'total_leaves': 23.25, 'Online_Checkin': 2.41,
+            'unbilled_flag': 1.0, 'unallocated_flag': 1.0, 'efficiency': 79.08,
+            'break_utilization': 0.196, 'punctuality': 3.27, 'burnout_hours': 0.42
+        }
+    },
+    {
+        'label': 'Silent Overworker',
+        'display': 2,
+        'profile': {
+            'avg_in_time_hr': 12.75, 'avg_office_hours': 9.21, 'avg_break_hours': 2.56,
+            'avg_ooo_hours': 1.90, 'total_leaves': 15.11, 'Online_Checkin': 1.64,
+            'unbilled_flag': 0.43, 'unallocated_flag': 0.004, 'efficiency': 71.71,
+            'break_utilization': 0.282, 'punctuality': 3.76, 'burnout_hours': 0.36
+        }
+    },
+    {
+        'label': 'Late Starter',
+        'display': 3,
+        'profile': {
+            'avg_in_time_hr': 12.63, 'avg_office_hours': 9.26, 'avg_break_hours': 1.60,
+            'avg_ooo_hours': 1.00, 'total_leaves': 12.69, 'Online_Checkin': 2.06,
+            'unbilled_flag': 0.37, 'unallocated_flag': 0.0, 'efficiency': 82.48,
+            'break_utilization': 0.173, 'punctuality': 3.65, 'burnout_hours': 0.33
+        }
+    },
+    {
+        'label': 'Erratic / At-Risk',
+        'display': 4,
+        'profile': {
+            'avg_in_time_hr': 10.76, 'avg_office_hours': 9.93, 'avg_break_hours': 1.53,
+            'avg_ooo_hours': 0.96, 'total_leaves': 12.02, 'Online_Checkin': 1.12,
+            'unbilled_flag': 0.31, 'unallocated_flag': 0.0, 'efficiency': 84.46,
+            'break_utilization': 0.154, 'punctuality': 1.95, 'burnout_hours': 0.93
+        }
+    }
+]
+
+# Labels of models trained before the assignment was saved with them
+LEGACY_LABELS = {
+    0: {'label': 'Consistent Performer', 'display': 1},
+    1: {'label': 'Late Starter', 'display': 3},
+    2: {'label': 'Erratic / At-Risk', 'display': 4},
+    3: {'label': 'Silent Overworker', 'display': 2}
+}
+
+
+def assign_labels(centers, scaler, profiles=REFERENCE_PROFILES):
+    """Match model centroids to reference behavior profiles.
+
+    The profiles are scaled with the model's own scaler and paired with the
+    centroids by minimum total Euclidean distance (Hungarian assignment), so
+    the labels follow the behavior rather than the arbitrary KMeans ids.
+    Centroids left over when k exceeds the number of profiles get a generic
+    label and display numbers after the reference ones.
+
+    Returns {cluster id: {'label', 'display', 'distance'}}.
+    """
+    # Only training needs scipy, the web app just reads the saved labels
+    from scipy.optimize import linear_sum_assignment
+
+    features = list(scaler.feature_names_in_)
+    reference = pd.DataFrame([profile['profile'] for profile in profiles])[features]
+    reference = scaler.transform(reference)
+
+    centers = np.asarray(centers)
+    distances = np.linalg.norm(centers[:, None, :] - reference[None, :, :], axis=2)
+    rows, columns = linear_sum_assignment(distances)
+
+    labels = {}
+    for cluster, index in zip(rows, columns):
+        labels[int(cluster)] = {
+            'label': profiles[index]['label'],
+            'display': profiles[index]['display'],
+            'distance': float(distances[cluster, index])
+        }
+    next_display = max(profile['display'] for profile in profiles) + 1
+    for cluster in range(len(centers)):
+        if cluster not in labels:
+            labels[cluster] = {'label': f'Cluster {cluster}', 'display': next_display, 'distance': None}
+            next_display += 1
+    return dict(sorted(labels.items()))
+
+
+def add_radii(labels, radii):
+    """Store each cluster's radius (RADIUS_QUANTILE of member distances) with its label."""
+    for cluster, entry in labels.items():
+        radius = radii.get(cluster)
+        entry['radius'] = None if radius is None or np.isnan(radius) else float(radius)
+    return labels
+
+
+def cluster_radii(clusters, distances):
+    """RADIUS_QUANTILE of the distances to the centroid per cluster id."""
+    return pd.Series(distances).groupby(np.asarray(clusters)).quantile(RADIUS_QUANTILE).to_dict()
+
+
+def load_labels(path=LABELS_PATH):
+    """Cluster labels saved with the model, or the legacy fixed mapping when there are none."""
+    try:
+        with open(path) as f:
+            return {int(cluster): entry for cluster, entry in json.load(f).items()}
+    except FileNotFoundError:
+        return LEGACY_LABELS
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read cluster labels {path}: {e}")
+        return LEGACY_LABELS
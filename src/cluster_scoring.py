@@ -0,0 +1,86 @@
+# src/cluster_scoring.py
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.artifact_registry import LABELS_FILE, MEDIANS_FILE, MODEL_FILE, SCALER_FILE
+from src.cluster_labels import load_labels
+from src.data_preprocessing import RAW_NUMERIC_COLUMNS, RAW_FEATURE_COLUMNS, add_features
+
+
+class ScoringError(ValueError):
+    """Raised for records that cannot be scored."""
+
+
+class ClusterScorer:
+    """Assigns raw attendance records to clusters of a trained model.
+
+    Records go through the same add_features() as training, are imputed
+    with the training medians and scaled with the training scaler, then all
+    records of a batch are assigned to their nearest centroid at once.
+    """
+
+    def __init__(self, model, scaler, labels, medians=None):
+        self.model = model
+        self.scaler = scaler
+        self.labels = labels
+        self.features = list(scaler.feature_names_in_)
+        # Models saved before the medians were stored impute with the scaler means instead
+        self.medians = medians if medians is not None else pd.Series(scaler.mean_, index=self.features)
+
+    @classmethod
+    def load(cls, models_dir):
+        """Load the model artifacts saved by training from models_dir."""
+        model = joblib.load(os.path.join(models_dir, MODEL_FILE))
+        scaler = joblib.load(os.path.join(models_dir, SCALER_FILE))
+        labels = load_labels(os.path.join(models_dir, LABELS_FILE))
+        try:
+            with open(os.path.join(models_dir, MEDIANS_FILE)) as f:
+                medians = pd.Series(json.load(f), dtype=float)
+        except FileNotFoundError:
+            medians = None
+        return cls(model, scaler, labels, medians)
+
+    def prepare(self, df):
+        """Coerce the raw fields of an attendance frame and add the model features, in place."""
+        missing = [column for column in RAW_FEATURE_COLUMNS if column not in df]
+        if missing:
+            raise ScoringError(f"Missing fields: {', '.join(missing)}")
+
+        # JSON clients may send counts as strings, which would concatenate instead of add
+        for column in RAW_NUMERIC_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+        return add_features(df)
+
+    def assign(self, df):
+        """Return (cluster ids, distance to their centroid) for a frame prepared by prepare()."""
+        X = self.scaler.transform(df[self.features].astype(float).fillna(self.medians[self.features]))
+        distances = self.model.transform(X)
+        clusters = distances.argmin(axis=1)
+        return clusters, distances[np.arange(len(clusters)), clusters]
+
+    def score(self, records):
+        """Score a list of raw attendance records (dicts keyed by the export's column names).
+
+        Returns one dict per record: id (Fake_Id when given), clusterId (model
+        cluster), cluster (website display cluster), clusterType and distance
+        (Euclidean distance to the centroid in the scaled feature space).
+        """
+        df = self.prepare(pd.DataFrame.from_records(records))
+        clusters, nearest = self.assign(df)
+
+        ids = df['Fake_Id'].tolist() if 'Fake_Id' in df else [None] * len(df)
+        unknown = {'label': None, 'display': None}
+        return [
+            {
+                'id': None if pd.isna(employee_id) else str(employee_id),
+                'clusterId': cluster,
+                'cluster': self.labels.get(cluster, unknown)['display'],
+                'clusterType': self.labels.get(cluster, unknown)['label'],
+                'distance': round(distance, 4)
+            }
+            for employee_id, cluster, distance in zip(ids, clusters.tolist(), nearest.tolist())
+        ]
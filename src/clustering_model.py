@@ -1,30 +1,198 @@
 # src/clustering_model.py
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 import joblib
+import numpy as np
 import pandas as pd
 import os
 
-def run_clustering(df, X_scaled, k=4, scaler=None, save=True):
-    kmeans = KMeans(n_clusters=k, random_state=42)
-    df['Cluster'] = kmeans.fit_predict(X_scaled)
+from src.artifact_registry import (
+    DATA_FILE, LABELS_FILE, MEDIANS_FILE, MODEL_FILE, REPORT_FILE, SCALER_FILE, SCORES_FILE, SNAPSHOT_FILE,
+    ArtifactRegistry, run_manifest, write_json
+)
+from src.attendance_snapshot import save_snapshot
+from src.cluster_labels import RADIUS_QUANTILE, add_radii, assign_labels, cluster_radii
+from src.data_preprocessing import iter_scaled_features
+from src.history_store import HistoryStore
+from src.quantile_sketch import QuantileSketch
 
-    # Manual labeling of clusters (to be tuned based on analysis)
-    cluster_map = {
-        0: "Consistent Performer",
-        1: "Late Starter",
-        2: "Erratic / At-Risk",
-        3: "Silent Overworker"
-    }
+ENGINES = ('kmeans', 'minibatch')
 
-    df['Behavior_Type'] = df['Cluster'].map(cluster_map)
+def previous_centers(k, n_features, path=None):
+    """Centroids of the saved model, or None (with a warning) when there is none with the same shape.
+
+    Defaults to the model of the current registry run (or the legacy models/ directory).
+    Without them training starts from a fresh initialisation, so cluster
+    numbers may not match the previous model's.
+    """
+    if path is None:
+        path = os.path.join(ArtifactRegistry().locate().models_dir, MODEL_FILE)
+    if not os.path.exists(path):
+        print(f"⚠️ No previous model at {path} to warm-start from, cluster numbering may change")
+        return None
+    try:
+        centers = joblib.load(path).cluster_centers_
+    except Exception as e:
+        print(f"⚠️ Could not load previous model {path}: {e}")
+        return None
+    if centers.shape != (k, n_features):
+        print(f"⚠️ Previous model {path} has {centers.shape[0]} clusters over {centers.shape[1]} features, "
+              f"not {k} over {n_features}; not warm-starting, cluster numbering may change")
+        return None
+    return centers
+
+
+def make_clusterer(k, engine='kmeans', n_init=None, max_iter=None, tol=None,
+                   init_centers=None, batch_size=4096, random_state=42):
+    """Build the clustering estimator for engine ('kmeans' or 'minibatch').
+
+    init_centers warm-starts from previous centroids, which also keeps the
+    cluster numbering of the previous model. Parameters left as None use the
+    scikit-learn defaults.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown clustering engine {engine!r}, expected one of {ENGINES}")
+
+    params = {'n_clusters': k, 'random_state': random_state}
+    if init_centers is not None:
+        # A fixed starting point makes extra initialisations pointless
+        params.update(init=np.asarray(init_centers), n_init=1)
+    elif n_init is not None:
+        params['n_init'] = n_init
+    if max_iter is not None:
+        params['max_iter'] = max_iter
+    if tol is not None:
+        params['tol'] = tol
+
+    if engine == 'minibatch':
+        return MiniBatchKMeans(batch_size=batch_size, **params)
+    return KMeans(**params)
+
+
+def fit_batches(model, batches, epochs=3, tol=None):
+    """Fit a MiniBatchKMeans with partial_fit() over an iterable of feature batches.
+
+    batches is a callable returning a fresh iterable for each epoch, so the
+    data never has to be in memory at once. Stops after epochs passes, or
+    earlier once no centroid moved more than tol during a pass.
+    """
+    for _ in range(epochs):
+        before = getattr(model, 'cluster_centers_', None)
+        before = None if before is None else before.copy()
+        for X in batches():
+            model.partial_fit(X)
+        if tol is not None and before is not None:
+            if np.linalg.norm(model.cluster_centers_ - before, axis=1).max() <= tol:
+                break
+    return model
+
+
+def label_clusters(df, labels):
+    """Set Behavior_Type from the {cluster id: {'label', ...}} assignment."""
+    df['Behavior_Type'] = df['Cluster'].map({cluster: entry['label'] for cluster, entry in labels.items()})
+    return df
+
+
+def save_model(model, scaler, labels, medians, directory, scores=None, report=None):
+    """Save the model with its scaler, cluster labels, imputation medians and optionally its scores
+    and the report of the k-selection sweep that picked it.
+
+    The medians are the training ones, so scoring imputes missing features like training did.
+    """
+    joblib.dump(model, os.path.join(directory, MODEL_FILE))
+    joblib.dump(scaler, os.path.join(directory, SCALER_FILE))
+    write_json({str(cluster): entry for cluster, entry in labels.items()}, os.path.join(directory, LABELS_FILE))
+    write_json({feature: float(value) for feature, value in medians.items()},
+               os.path.join(directory, MEDIANS_FILE))
+    if scores is not None:
+        write_json(scores, os.path.join(directory, SCORES_FILE))
+    if report is not None:
+        write_json(report, os.path.join(directory, REPORT_FILE))
+
+
+def run_clustering(df, X_scaled, k=4, scaler=None, save=True, engine='kmeans', n_init=None,
+                   max_iter=None, tol=None, warm_start=False, batch_size=4096, model=None,
+                   scores=None, report=None, period=None):
+    """Cluster X_scaled into df['Cluster'] and label it.
+
+    model reuses an already fitted estimator (e.g. the one a k-selection
+    sweep picked) instead of fitting a new one; scores and the sweep report
+    are saved next to it.
+    With save, the data and model are published together as a new run of
+    the artifact registry, and the employees are recorded in the history
+    for period (YYYY-MM, default: this month).
+    """
+    if model is not None:
+        kmeans = model
+        df['Cluster'] = kmeans.predict(X_scaled)
+    else:
+        init_centers = previous_centers(k, X_scaled.shape[1]) if warm_start else None
+        kmeans = make_clusterer(k, engine, n_init=n_init, max_iter=max_iter, tol=tol,
+                                init_centers=init_centers, batch_size=batch_size)
+        df['Cluster'] = kmeans.fit_predict(X_scaled)
+    # Labels come from matching the centroids to reference behavior profiles, not from the ids
+    labels = assign_labels(kmeans.cluster_centers_, scaler)
+    label_clusters(df, labels)
+    # Typical member distances, so later assignments far outside a cluster can be flagged as drift
+    distances = kmeans.transform(X_scaled)[np.arange(len(df)), df['Cluster'].to_numpy()]
+    add_radii(labels, cluster_radii(df['Cluster'], distances))
 
     if save:
-        os.makedirs("data", exist_ok=True)
-        os.makedirs("models", exist_ok=True)
-        df.to_csv("data/processed_attendance.csv", index=False)
-        joblib.dump(kmeans, "models/kmeans_model.pkl")
-        joblib.dump(scaler, "models/scaler.pkl")
+        registry = ArtifactRegistry()
+        with registry.new_run() as run:
+            df.to_csv(run.file(DATA_FILE), index=False)
+            # Typed columnar copy that the web app loads instead of parsing the CSV
+            save_snapshot(df, run.file(SNAPSHOT_FILE))
+            features = list(scaler.feature_names_in_)
+            save_model(kmeans, scaler, labels, df[features].median(), run.path, scores, report)
+            HistoryStore(registry.history_dir).append(df, run.run_id, period)
+            run.publish(**run_manifest(kmeans, scaler, labels, len(df), estimator=type(kmeans).__name__))
+        registry.prune()
 
     return df, kmeans
 
 
+def run_clustering_streaming(features_path, scaler, features, medians, k=4, save=True, n_init=None,
+                             max_iter=None, tol=None, warm_start=False, batch_size=4096,
+                             chunksize=100_000, epochs=3, period=None):
+    """Out-of-core run_clustering() over a file written by preprocess_attendance_streaming().
+
+    Fits a MiniBatchKMeans from scaled feature batches, then assigns clusters
+    chunk by chunk and appends the labelled rows to the processed CSV of a
+    new registry run. The binary snapshot needs the whole frame, so it is
+    not written here; the web app reads the CSV.
+    partial_fit() ignores the estimator's max_iter and tol, so here they are
+    the stopping rules of the passes over the file: max_iter caps their
+    number (default epochs) and tol ends them once no centroid moves more
+    than it (in scaled feature units) during a pass.
+    """
+    init_centers = previous_centers(k, len(features)) if warm_start else None
+    kmeans = make_clusterer(k, 'minibatch', n_init=n_init, init_centers=init_centers, batch_size=batch_size)
+    fit_batches(kmeans, lambda: iter_scaled_features(features_path, scaler, features, medians, chunksize),
+                epochs=epochs if max_iter is None else max_iter, tol=tol)
+    labels = assign_labels(kmeans.cluster_centers_, scaler)
+
+    if save:
+        registry = ArtifactRegistry()
+        history = HistoryStore(registry.history_dir)
+        with registry.new_run() as run, history.part_writer() as history_part:
+            rows = 0
+            sketches = [QuantileSketch() for _ in range(k)]
+            for chunk in pd.read_csv(features_path, chunksize=chunksize):
+                distances = kmeans.transform(scaler.transform(chunk[features].fillna(medians)))
+                clusters = distances.argmin(axis=1)
+                chunk['Cluster'] = clusters
+                label_clusters(chunk, labels)
+                nearest = distances[np.arange(len(clusters)), clusters]
+                for cluster, sketch in enumerate(sketches):
+                    sketch.update(nearest[clusters == cluster])
+                chunk.to_csv(run.file(DATA_FILE), mode='a', header=rows == 0, index=False)
+                # Spilled sorted to disk, merged into the history part without loading every row
+                history_part.add(chunk)
+                rows += len(chunk)
+            add_radii(labels, {cluster: sketch.quantile(RADIUS_QUANTILE) for cluster, sketch in enumerate(sketches)})
+            save_model(kmeans, scaler, labels, medians, run.path)
+            history.append_part(history_part, run.run_id, period)
+            run.publish(**run_manifest(kmeans, scaler, labels, rows, estimator=type(kmeans).__name__))
+        registry.prune()
+
+    return kmeans
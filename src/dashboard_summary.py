@@ -0,0 +1,130 @@
+# src/dashboard_summary.py
+import numpy as np
+import pandas as pd
+
+# Efficiency ranges shown in the dashboard distribution chart, as [low, high) bounds
+# (the last range also includes 100%)
+EFFICIENCY_RANGES = [
+    ('60-70%', 60, 70),
+    ('70-80%', 70, 80),
+    ('80-90%', 80, 90),
+    ('90-95%', 90, 95),
+    ('95-100%', 95, 100)
+]
+
+# Histogram edges: a bin for the first edge itself, (low, high] bins, then an open-ended bin
+BURNOUT_HOURS_BINS = [0, 1, 2, 3]
+ABSENTEEISM_DAYS_BINS = [0, 2, 4, 8, 12]
+
+# Risk levels as used by the dashboard risk assessment, keyed on behavior type
+RISK_LEVELS = {
+    'Erratic / At-Risk': 'high',
+    'Silent Overworker': 'medium',
+    'Late Starter': 'medium',
+    'Consistent Performer': 'low'
+}
+
+CLUSTER_METRICS = ['efficiency', 'punctuality', 'bayHours', 'absenteeism_days']
+AVERAGE_METRICS = [
+    'efficiency', 'attendance', 'punctuality', 'bayHours', 'cafeteriaHours',
+    'oooHours', 'absenteeism_days', 'burnout_hours'
+]
+
+RANKING_SIZE = 5
+
+
+def mean(values):
+    """Mean rounded for display, 0 for an empty selection."""
+    return round(float(values.mean()), 2) if len(values) else 0
+
+
+def column(frame, name):
+    """Numeric column with missing values as 0, like the dashboard's `|| 0`."""
+    if name not in frame:
+        return np.zeros(len(frame))
+    return frame[name].to_numpy(dtype=float, na_value=0)
+
+
+def histogram(values, edges):
+    """Count values at or below the first edge, in each (low, high] range, and above the last edge."""
+    counts = np.bincount(np.searchsorted(edges, values, side='left'), minlength=len(edges) + 1)
+    labels = (
+        [f'{edges[0]:g}']
+        + [f'{low:g}-{high:g}' for low, high in zip(edges, edges[1:])]
+        + [f'{edges[-1]:g}+']
+    )
+    return [{'range': label, 'count': int(count)} for label, count in zip(labels, counts)]
+
+
+def efficiency_distribution(efficiency):
+    """Count employees per dashboard efficiency range."""
+    distribution = []
+    for index, (label, low, high) in enumerate(EFFICIENCY_RANGES):
+        last = index == len(EFFICIENCY_RANGES) - 1
+        in_range = (efficiency >= low) & ((efficiency <= high) if last else (efficiency < high))
+        distribution.append({'range': label, 'count': int(in_range.sum())})
+    return distribution
+
+
+def ranking_entry(frame, position):
+    """Fields the dashboard efficiency ranking lists display."""
+    row = frame.iloc[position]
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'designation': row['designation'],
+        'efficiency': None if pd.isna(row['efficiency']) else int(row['efficiency'])
+    }
+
+
+def build_dashboard_summary(frame):
+    """Aggregate the dashboard widgets from the columnar employee frame."""
+    total = len(frame)
+    efficiency = column(frame, 'efficiency')
+    attendance = column(frame, 'attendance')
+    burnout_hours = column(frame, 'burnout_hours')
+    absenteeism_days = column(frame, 'absenteeism_days')
+
+    # Same burnout risk criteria as the dashboard quick stats
+    at_risk = (attendance < 80) | (efficiency < 70) | (burnout_hours > 0) | (absenteeism_days > 8)
+
+    clusters = []
+    if total and 'cluster' in frame:
+        for cluster, group in frame.groupby('cluster', sort=True):
+            entry = {
+                'cluster': int(cluster),
+                'clusterType': group['clusterType'].iloc[0] if 'clusterType' in group else None,
+                'count': len(group)
+            }
+            for metric in CLUSTER_METRICS:
+                entry[metric] = mean(column(group, metric))
+            clusters.append(entry)
+
+    risk_levels = {'high': 0, 'medium': 0, 'low': 0}
+    if 'clusterType' in frame:
+        # Unknown behavior types count as medium risk, as in the dashboard
+        levels = frame['clusterType'].map(RISK_LEVELS).fillna('medium').value_counts()
+        risk_levels.update({level: int(count) for level, count in levels.items()})
+
+    # Stable descending sort, matching the client-side ranking
+    ranked = np.argsort(-efficiency, kind='stable')
+    top = ranked[:RANKING_SIZE]
+    bottom = ranked[-RANKING_SIZE:][::-1]
+
+    return {
+        'totalEmployees': total,
+        'averages': {metric: mean(column(frame, metric)) for metric in AVERAGE_METRICS},
+        'burnoutRisk': {
+            'count': int(at_risk.sum()),
+            'rate': round(float(at_risk.mean()) * 100, 2) if total else 0
+        },
+        'riskLevels': risk_levels,
+        'clusters': clusters,
+        'efficiencyDistribution': efficiency_distribution(efficiency),
+        'burnoutHistogram': histogram(burnout_hours, BURNOUT_HOURS_BINS),
+        'absenteeismHistogram': histogram(absenteeism_days, ABSENTEEISM_DAYS_BINS),
+        'efficiencyRankings': {
+            'top': [ranking_entry(frame, position) for position in top],
+            'bottom': [ranking_entry(frame, position) for position in bottom]
+        }
+    }
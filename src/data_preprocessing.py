@@ -1,38 +1,120 @@
 # src/data_preprocessing.py
+import os
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 from datetime import time
 
+from src.quantile_sketch import QuantileSketch
+
 def to_hours(x):
     """Convert time string or time object to float hour."""
     if pd.isna(x):
         return np.nan
     if isinstance(x, time):
-        return x.hour + x.minute / 60
+        return x.hour + x.minute / 60 + x.second / 3600
     try:
-        parts = str(x).split(':')
-        h, m = float(parts[0]), float(parts[1]) if len(parts) > 1 else 0
-        return h + m / 60
-    except:
+        parts = [float(part) for part in str(x).split(':')[:3]]
+    except ValueError:
         return np.nan
+    parts += [0.0] * (3 - len(parts))
+    return parts[0] + parts[1] / 60 + parts[2] / 3600
 
 
-def preprocess_attendance(path: str):
-    df = pd.read_excel(path)
+def column_to_hours(series):
+    """Vectorized to_hours() for a whole column; unparseable values become NaN."""
+    if pd.api.types.is_timedelta64_dtype(series):
+        return series.dt.total_seconds() / 3600
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.hour + series.dt.minute / 60 + series.dt.second / 3600
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+
+    # Attendance times repeat a lot (at most 86400 distinct "HH:MM:SS" values), so only
+    # the unique values are parsed and the results are broadcast back with their codes
+    codes, uniques = pd.factorize(series)
+    hours = parse_time_strings(pd.Series(uniques, dtype=object).astype(str)).to_numpy()
+    return pd.Series(np.where(codes >= 0, hours[codes], np.nan), index=series.index)
+
+
+def parse_time_strings(text):
+    """Parse "HH[:MM[:SS]]" strings (time objects format the same way) into float hours."""
+    parts = text.str.strip().str.split(':', n=2, expand=True).reindex(columns=range(3))
+    numeric = parts.apply(pd.to_numeric, errors='coerce')
+    # A part that is present but not a number invalidates the value, as in to_hours()
+    invalid = (parts.notna() & numeric.isna()).any(axis=1)
+    hours = numeric[0] + numeric[1].fillna(0) / 60 + numeric[2].fillna(0) / 3600
+    return hours.mask(invalid)
+
+
+def excel_engine():
+    """Use the Rust-based calamine reader when it is installed, it is much faster than openpyxl."""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return None
+
+
+def parquet_reader():
+    """pyarrow.parquet, which reads Parquet exports, with an install hint when it is missing."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet attendance exports needs pyarrow: pip install pyarrow") from None
+    return pq
+
+
+def read_attendance(path: str):
+    """Read a raw attendance export from .csv, .parquet or .xlsx/.xls."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(path)
+    if extension in ('.parquet', '.pq'):
+        # Fails with the install hint rather than pandas' generic missing-engine error
+        parquet_reader()
+        return pd.read_parquet(path)
+    if extension in ('.xlsx', '.xlsm', '.xls'):
+        return pd.read_excel(path, engine=excel_engine())
+    raise ValueError(f"Unsupported attendance file format: {path}")
+
+
+# Selected numeric features for clustering
+FEATURES = [
+    'avg_in_time_hr', 'avg_office_hours', 'avg_break_hours', 'avg_ooo_hours',
+    'total_leaves', 'Online_Checkin', 'unbilled_flag', 'unallocated_flag',
+    'efficiency', 'break_utilization', 'punctuality', 'burnout_hours'
+]
+
+# Raw export columns add_features() reads, and which of them are counts
+RAW_FEATURE_COLUMNS = [
+    'Avg_In_Tim', 'Avg_Office_hr', 'Avg_Break_hr', 'Avg_OOO_hr', 'Avg_Bay_hr', 'Avg_Cafeteria',
+    'Half_Day', 'Full_Day', 'Unbilled', 'Unallocated', 'Online_Checkin'
+]
+RAW_NUMERIC_COLUMNS = ['Half_Day', 'Full_Day', 'Online_Checkin']
+
+# Rows per chunk when streaming an export that does not fit in memory
+CHUNK_SIZE = 100_000
+
 
+def add_features(df):
+    """Add the derived feature columns to a raw attendance frame, in place.
+
+    Every feature depends only on its own row, so this works the same on a
+    whole export or on one chunk of it.
+    """
     # Feature engineering - Basic time conversions
-    df['avg_in_time_hr'] = df['Avg_In_Tim'].apply(to_hours)
-    df['avg_office_hours'] = df['Avg_Office_hr'].apply(to_hours)
-    df['avg_break_hours'] = df['Avg_Break_hr'].apply(to_hours)
-    df['avg_ooo_hours'] = df['Avg_OOO_hr'].apply(to_hours)
+    df['avg_in_time_hr'] = column_to_hours(df['Avg_In_Tim'])
+    df['avg_office_hours'] = column_to_hours(df['Avg_Office_hr'])
+    df['avg_break_hours'] = column_to_hours(df['Avg_Break_hr'])
+    df['avg_ooo_hours'] = column_to_hours(df['Avg_OOO_hr'])
     df['total_leaves'] = df['Half_Day'] + df['Full_Day']
     df['unbilled_flag'] = df['Unbilled'].astype(str).str.lower().eq('unbilled').astype(int)
     df['unallocated_flag'] = df['Unallocated'].astype(str).str.lower().eq('yes').astype(int)
 
     # Additional derived time columns for analysis
-    df['bay_hours'] = df['Avg_Bay_hr'].apply(to_hours)     # ✅ renamed to match usage
-    df['cafeteria_hours'] = df['Avg_Cafeteria'].apply(to_hours)
+    df['bay_hours'] = column_to_hours(df['Avg_Bay_hr'])     # ✅ renamed to match usage
+    df['cafeteria_hours'] = column_to_hours(df['Avg_Cafeteria'])
 
     # Calculate efficiency using Total Productive Time formula:
     # Efficiency (%) = bay_hours / Office_hours * 100
@@ -56,15 +138,77 @@ def preprocess_attendance(path: str):
     # Calculate burnout hours: office hours exceeding 9 hours
     df['burnout_hours'] = np.maximum(0, df['avg_office_hours'].fillna(0) - 9.0)
 
-    # Selected numeric features for clustering
-    features = [
-        'avg_in_time_hr', 'avg_office_hours', 'avg_break_hours', 'avg_ooo_hours',
-        'total_leaves', 'Online_Checkin', 'unbilled_flag', 'unallocated_flag',
-        'efficiency', 'break_utilization', 'punctuality', 'burnout_hours'
-    ]
+    return df
+
 
+def preprocess_attendance(path: str):
+    df = add_features(read_attendance(path))
+
+    features = list(FEATURES)
     X = df[features].fillna(df[features].median())
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
 
-    return df, X_scaled, scaler, features
\ No newline at end of file
+    return df, X_scaled, scaler, features
+
+
+def iter_attendance_chunks(path: str, chunksize=CHUNK_SIZE):
+    """Yield a raw attendance export as DataFrames of at most chunksize rows."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif extension in ('.parquet', '.pq'):
+        for batch in parquet_reader().ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif extension in ('.xlsx', '.xlsm', '.xls'):
+        # Excel readers load the whole workbook, convert large exports to CSV or Parquet first
+        raise ValueError(f"Excel files cannot be streamed, convert {path} to CSV or Parquet")
+    else:
+        raise ValueError(f"Unsupported attendance file format: {path}")
+
+
+def preprocess_attendance_streaming(path: str, output_path: str, chunksize=CHUNK_SIZE):
+    """Chunked preprocess_attendance() for exports larger than memory.
+
+    The first pass adds the features to each chunk, appends it to
+    output_path (CSV) and feeds a quantile sketch per feature for the
+    imputation medians. The second pass reads the features back, imputes
+    them and fits the scaler with partial_fit(). Only one chunk is held in
+    memory at a time.
+
+    Returns (scaler, features, medians); scaled batches for the written rows
+    come from iter_scaled_features().
+    """
+    features = list(FEATURES)
+    sketches = {feature: QuantileSketch() for feature in features}
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = output_path + '.tmp'
+    try:
+        header = True
+        for chunk in iter_attendance_chunks(path, chunksize):
+            add_features(chunk)
+            for feature in features:
+                sketches[feature].update(chunk[feature].to_numpy(dtype=np.float64))
+            chunk.to_csv(tmp_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    medians = pd.Series({feature: sketch.median() for feature, sketch in sketches.items()})
+    scaler = StandardScaler()
+    for chunk in pd.read_csv(output_path, usecols=features, chunksize=chunksize):
+        scaler.partial_fit(chunk[features].fillna(medians))
+
+    return scaler, features, medians
+
+
+def iter_scaled_features(output_path: str, scaler, features, medians, chunksize=CHUNK_SIZE):
+    """Yield imputed, scaled feature batches of a file written by preprocess_attendance_streaming()."""
+    for chunk in pd.read_csv(output_path, usecols=features, chunksize=chunksize):
+        yield scaler.transform(chunk[features].fillna(medians))
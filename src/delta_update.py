@@ -0,0 +1,125 @@
+# src/delta_update.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.artifact_registry import DATA_FILE, MODEL_FILES, SNAPSHOT_FILE, ArtifactRegistry, run_manifest
+from src.attendance_snapshot import load_snapshot, save_snapshot, snapshot_path_for
+from src.cluster_scoring import ClusterScorer
+from src.data_preprocessing import read_attendance
+from src.history_store import HistoryStore
+
+KEY = 'Fake_Id'
+
+# Above this share of changed or new rows the population has moved enough to retrain
+CHANGE_THRESHOLD = 0.2
+
+# Above this share of delta rows outside their cluster's radius the centroids no longer fit.
+# The radius covers 95% of the training members, so about 5% is expected.
+OUTLIER_THRESHOLD = 0.15
+
+
+def read_processed(path):
+    """Read processed attendance data, preferring its binary snapshot when that is newer."""
+    snapshot_path = snapshot_path_for(path)
+    if os.path.exists(snapshot_path) and (
+            not os.path.exists(path) or os.path.getmtime(snapshot_path) >= os.path.getmtime(path)):
+        return load_snapshot(snapshot_path, mmap=False)
+    return pd.read_csv(path)
+
+
+def merge_delta(processed, delta, key=KEY):
+    """Replace the rows of processed whose key appears in delta and append the new keys.
+
+    Row order is kept, new rows go at the end. Columns the delta does not
+    have keep their previous values for existing rows.
+    """
+    delta = delta.drop_duplicates(key, keep='last')
+    old_keys = processed[key].astype(str)
+    new_keys = delta[key].astype(str)
+    columns = processed.columns.union(delta.columns, sort=False)
+
+    existing = old_keys.isin(new_keys)
+    updated = delta.set_axis(new_keys).loc[old_keys[existing]]
+    previous = processed[existing].set_axis(updated.index)
+    updated = updated.reindex(columns=columns)
+    for column in processed.columns.difference(delta.columns):
+        updated[column] = previous[column]
+
+    added = delta[~new_keys.isin(old_keys).to_numpy()]
+    # Positions in the merged frame: updated rows keep their place, added rows follow
+    pieces = [
+        processed[~existing].reindex(columns=columns).set_axis(np.flatnonzero(~existing)),
+        updated.set_axis(np.flatnonzero(existing)),
+        added.reindex(columns=columns).set_axis(len(processed) + np.arange(len(added)))
+    ]
+    merged = pd.concat([piece for piece in pieces if len(piece)]).sort_index(kind='stable')
+    return merged.reset_index(drop=True)
+
+
+def drift_report(delta, distances, labels, total_rows, change_threshold=CHANGE_THRESHOLD,
+                 outlier_threshold=OUTLIER_THRESHOLD):
+    """Share of changed rows and of delta rows outside their cluster radius, with the verdict."""
+    report = {
+        'changed_rows': len(delta),
+        'total_rows': total_rows,
+        'changed_share': len(delta) / total_rows if total_rows else 0.0,
+        'outlier_share': None,
+        'reasons': []
+    }
+    radii = delta['Cluster'].map({cluster: entry.get('radius') for cluster, entry in labels.items()})
+    if len(delta) and radii.notna().all():
+        report['outlier_share'] = float(np.mean(distances > radii.to_numpy(dtype=float)))
+
+    if report['changed_share'] > change_threshold:
+        report['reasons'].append(
+            f"{report['changed_share']:.0%} of rows changed (threshold {change_threshold:.0%})")
+    if report['outlier_share'] is not None and report['outlier_share'] > outlier_threshold:
+        report['reasons'].append(
+            f"{report['outlier_share']:.0%} of changed rows are outside their cluster radius "
+            f"(threshold {outlier_threshold:.0%})")
+    report['drift'] = bool(report['reasons'])
+    return report
+
+
+def apply_delta(delta_path, registry=None, change_threshold=CHANGE_THRESHOLD,
+                outlier_threshold=OUTLIER_THRESHOLD, period=None):
+    """Score a delta export of changed or new employees with the frozen model and merge it.
+
+    Only the delta rows go through feature engineering and cluster
+    assignment. The merged data is published with the unchanged model files
+    as a new run of the artifact registry, so readers switch to it
+    atomically, and recorded in the history for period (YYYY-MM, default:
+    this month). Returns (merged frame, drift report, manifest).
+    """
+    registry = registry or ArtifactRegistry()
+    artifacts = registry.locate()
+    scorer = ClusterScorer.load(artifacts.models_dir)
+    delta = read_attendance(delta_path)
+    if KEY not in delta:
+        raise ValueError(f"Delta file {delta_path} has no {KEY} column")
+
+    scorer.prepare(delta)
+    clusters, distances = scorer.assign(delta)
+    delta['Cluster'] = clusters
+    delta['Behavior_Type'] = delta['Cluster'].map(
+        {cluster: entry['label'] for cluster, entry in scorer.labels.items()})
+
+    merged = merge_delta(read_processed(os.path.join(artifacts.data_dir, DATA_FILE)), delta)
+    report = drift_report(delta, distances, scorer.labels, len(merged), change_threshold, outlier_threshold)
+
+    base = registry.manifest(artifacts.run_id) if artifacts.run_id else {}
+    with registry.new_run() as run:
+        for name in MODEL_FILES:
+            if os.path.exists(os.path.join(artifacts.models_dir, name)):
+                run.add_file(os.path.join(artifacts.models_dir, name))
+        merged.to_csv(run.file(DATA_FILE), index=False)
+        save_snapshot(merged, run.file(SNAPSHOT_FILE))
+        manifest = {key: value for key, value in base.items() if key not in ('run_id', 'created_at', 'files')}
+        manifest.update(run_manifest(scorer.model, scorer.scaler, scorer.labels, len(merged)))
+        manifest.update(parent=artifacts.run_id, delta=report)
+        HistoryStore(registry.history_dir).append(merged, run.run_id, period)
+        manifest = run.publish(**manifest)
+    registry.prune()
+    return merged, report, manifest
@@ -0,0 +1,143 @@
+# src/employee_query.py
+import base64
+import binascii
+
+import numpy as np
+
+# Exact-match filters, each takes a comma-separated list of accepted values
+VALUE_FILTERS = ('designation', 'accountCode', 'recruitment_type', 'clusterType')
+
+# Numeric fields that accept min_<field> / max_<field> range filters
+RANGE_FILTERS = (
+    'efficiency', 'punctuality', 'attendance', 'score', 'bayHours',
+    'absenteeism_days', 'burnout_hours'
+)
+
+# Query parameters that switch /api/employees from the full list to a query
+QUERY_PARAMS = (
+    {'cluster', 'fields', 'sort', 'limit', 'cursor'}
+    | set(VALUE_FILTERS)
+    | {f'{bound}_{field}' for field in RANGE_FILTERS for bound in ('min', 'max')}
+)
+
+MAX_LIMIT = 1000
+
+
+class QueryError(ValueError):
+    """Raised for malformed employee query parameters."""
+
+
+def split_values(raw):
+    """Split a comma-separated parameter into its non-empty values."""
+    return [value.strip() for value in raw.split(',') if value.strip()]
+
+
+def parse_number(args, name, cast=float):
+    """Read an optional numeric parameter, None when absent."""
+    raw = args.get(name)
+    if raw is None or raw == '':
+        return None
+    try:
+        return cast(raw)
+    except ValueError:
+        raise QueryError(f"'{name}' must be a number")
+
+
+def filter_mask(frame, args):
+    """Boolean mask over the employee frame for the filters present in args."""
+    mask = np.ones(len(frame), dtype=bool)
+
+    if args.get('cluster'):
+        try:
+            clusters = [int(value) for value in split_values(args['cluster'])]
+        except ValueError:
+            raise QueryError("'cluster' must be a comma-separated list of integers")
+        mask &= frame['cluster'].isin(clusters).to_numpy()
+
+    for field in VALUE_FILTERS:
+        if args.get(field):
+            if field not in frame:
+                return np.zeros(len(frame), dtype=bool)
+            mask &= frame[field].isin(split_values(args[field])).to_numpy()
+
+    for field in RANGE_FILTERS:
+        low = parse_number(args, f'min_{field}')
+        high = parse_number(args, f'max_{field}')
+        if low is None and high is None:
+            continue
+        if field not in frame:
+            return np.zeros(len(frame), dtype=bool)
+        values = frame[field].to_numpy(dtype=float)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+
+    return mask
+
+
+def sort_positions(frame, positions, sort):
+    """Order positions by a frame column; a leading '-' sorts descending."""
+    field = sort.lstrip('-')
+    if field not in frame:
+        raise QueryError(f"Cannot sort by '{field}'")
+    # frame has a RangeIndex, so the sorted index labels are the positions
+    values = frame[field].iloc[positions]
+    ordered = values.sort_values(ascending=not sort.startswith('-'), kind='stable', na_position='last')
+    return ordered.index.to_numpy()
+
+
+def encode_cursor(version, offset):
+    """Opaque cursor for the page starting at offset in this snapshot version."""
+    return base64.urlsafe_b64encode(f'{version}:{offset}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, version):
+    """Return the offset stored in cursor, rejecting cursors from another snapshot."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_version, offset = base64.urlsafe_b64decode(padded).decode().rsplit(':', 1)
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise QueryError('Invalid cursor')
+    if cursor_version != version:
+        raise QueryError('Cursor has expired because the data changed, restart from the first page')
+    return offset
+
+
+def query_employees(snapshot, args):
+    """Filter, sort, page and project the snapshot's employees.
+
+    Returns (total matches, page of records, cursor for the next page or None).
+    """
+    frame = snapshot.frame
+    positions = np.flatnonzero(filter_mask(frame, args))
+
+    if args.get('sort'):
+        positions = sort_positions(frame, positions, args['sort'])
+
+    limit = parse_number(args, 'limit', int)
+    if limit is not None and limit < 1:
+        raise QueryError("'limit' must be at least 1")
+    offset = decode_cursor(args['cursor'], snapshot.version) if args.get('cursor') else 0
+
+    total = len(positions)
+    if limit is None:
+        page = positions[offset:]
+        next_cursor = None
+    else:
+        limit = min(limit, MAX_LIMIT)
+        page = positions[offset:offset + limit]
+        next_cursor = encode_cursor(snapshot.version, offset + limit) if offset + limit < total else None
+
+    employees = snapshot.employees
+    if args.get('fields'):
+        fields = split_values(args['fields'])
+        unknown = [field for field in fields if field not in employees[0]] if employees else []
+        if unknown:
+            raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+        records = [{field: employees[p][field] for field in fields} for p in page.tolist()]
+    else:
+        records = [employees[p] for p in page.tolist()]
+
+    return total, records, next_cursor
@@ -0,0 +1,473 @@
+# src/history_store.py
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.artifact_registry import new_run_id, write_json
+from src.attendance_snapshot import (
+    encode_column, load_snapshot, read_arrays, save_snapshot, smallest_int_dtype, write_snapshot
+)
+
+KEY = 'Fake_Id'
+
+# Per-employee columns of the processed attendance data recorded for every period
+METRICS = [
+    'efficiency', 'punctuality', 'absenteeism_days', 'bay_hours', 'avg_office_hours',
+    'avg_break_hours', 'avg_ooo_hours', 'burnout_hours', 'Behavior_Type'
+]
+# The one text column of METRICS, stored as categorical codes
+LABEL_COLUMN = 'Behavior_Type'
+
+INDEX_FILE = 'index.json'
+PARTITION_PREFIX = 'period='
+ROLLUPS_DIR = 'rollups'
+
+# Periods are calendar months
+PERIOD_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+# Calendar months, ending with the newest period, the rolling aggregates and the per-employee series cover
+ROLLING_WINDOW = 12
+SHORT_WINDOW = 3
+
+# Metrics whose rolling means are precomputed
+ROLLING_METRICS = ['efficiency', 'punctuality', 'absenteeism_days']
+
+# Rows held in memory at a time when merging the chunks of a part or computing rollups
+BLOCK_ROWS = 250_000
+
+
+def current_period():
+    """The period of data exported now (the current UTC month)."""
+    return time.strftime('%Y-%m', time.gmtime())
+
+
+def check_period(period):
+    """Return period if it is a valid YYYY-MM period; raises ValueError otherwise."""
+    if not isinstance(period, str) or not PERIOD_PATTERN.match(period):
+        raise ValueError(f"Invalid period {period!r}, expected YYYY-MM")
+    return period
+
+
+def month_range(end, count):
+    """The count calendar months ending with the period end, oldest first."""
+    year, month = (int(part) for part in end.split('-'))
+    last = year * 12 + month - 1
+    return [f'{index // 12:04d}-{index % 12 + 1:02d}' for index in range(last - count + 1, last + 1)]
+
+
+def series_columns(window=ROLLING_WINDOW):
+    """Rollup columns holding the efficiency of each period of the window, oldest first."""
+    return [f'efficiency_{position}' for position in range(window)]
+
+
+def history_frame(df):
+    """The recorded columns of a processed frame, one row per employee sorted by Fake_Id."""
+    frame = df.reindex(columns=[KEY] + METRICS)
+    frame = frame.drop_duplicates(KEY).sort_values(KEY, kind='stable')
+    return frame.reset_index(drop=True)
+
+
+def find_position(keys, employee_id):
+    """Row of employee_id (a string, as in the URL) in the sorted key column, None if absent."""
+    if pd.api.types.is_numeric_dtype(keys):
+        try:
+            employee_id = int(employee_id)
+        except ValueError:
+            return None
+    position = int(np.searchsorted(keys, employee_id))
+    if position < len(keys) and keys[position] == employee_id:
+        return position
+    return None
+
+
+def lookup(keys, ids):
+    """Positions of ids in the sorted key column, -1 where absent (find_position for many ids)."""
+    if len(keys) == 0:
+        return np.full(len(ids), -1)
+    positions = np.searchsorted(keys, ids)
+    found = (positions < len(keys)) & (keys[np.minimum(positions, len(keys) - 1)] == ids)
+    return np.where(found, positions, -1)
+
+
+def compute_rollups(parts, window=ROLLING_WINDOW, ids=None):
+    """Rolling aggregates of the employees of the newest part over the given parts.
+
+    parts are the history frames of consecutive calendar months, oldest
+    first, None for months without data; only the last window are used and
+    the last must not be None. Returns one row per employee of the newest
+    month with the number of months it appears in, the means over the last
+    SHORT_WINDOW and window months, its latest earlier efficiency within
+    the window and the efficiency of each month (NaN where it has none).
+    ids restricts the result to those employees of the newest month, in
+    sorted order.
+    """
+    parts = parts[-window:]
+    if ids is None:
+        ids = parts[-1][KEY].to_numpy()
+    values = {metric: np.full((len(ids), window), np.nan) for metric in ROLLING_METRICS}
+    offset = window - len(parts)
+    for column, part in enumerate(parts, start=offset):
+        if part is None:
+            continue
+        positions = lookup(part[KEY].to_numpy(), ids)
+        found = positions >= 0
+        for metric in ROLLING_METRICS:
+            values[metric][found, column] = part[metric].to_numpy(dtype=float)[positions[found]]
+
+    rollups = {KEY: ids, 'periods': np.isfinite(values['efficiency']).sum(axis=1)}
+    for metric in ROLLING_METRICS:
+        for size in (SHORT_WINDOW, window):
+            window_values = values[metric][:, -size:]
+            present = np.isfinite(window_values).sum(axis=1)
+            means = np.nansum(window_values, axis=1) / np.maximum(present, 1)
+            rollups[f'{metric}_mean_{size}'] = np.where(present > 0, means, np.nan)
+    # Latest efficiency before the newest period, carried forward over missing periods
+    previous = pd.DataFrame(values['efficiency'][:, :-1]).ffill(axis=1)
+    rollups['efficiency_previous'] = previous.iloc[:, -1].to_numpy()
+    for name, column in zip(series_columns(window), values['efficiency'].T):
+        rollups[name] = column
+    return pd.DataFrame(rollups)
+
+
+def write_rollups(parts, path, block_rows=BLOCK_ROWS):
+    """Write compute_rollups() of parts to path, BLOCK_ROWS employees at a time."""
+    ids = parts[-1][KEY].to_numpy()
+    if len(ids) <= block_rows:
+        save_snapshot(compute_rollups(parts), path)
+        return
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='.rollups-', dir=directory) as scratch:
+        columns = {}
+        for start in range(0, len(ids), block_rows):
+            block = compute_rollups(parts, ids=ids[start:start + block_rows])
+            for index, name in enumerate(block.columns[1:]):
+                if name not in columns:
+                    columns[name] = np.lib.format.open_memmap(
+                        os.path.join(scratch, f'{index}.npy'), mode='w+', dtype=block[name].dtype, shape=(len(ids),))
+                columns[name][start:start + len(block)] = block[name].to_numpy()
+        key = ('numeric', {'values': ids}) if ids.dtype.kind in 'iuf' else encode_column(pd.Series(ids))
+        write_snapshot([key + (KEY,)] + [('numeric', {'values': values}, name) for name, values in columns.items()],
+                       len(ids), path)
+        del columns
+
+
+class PartWriter:
+    """Writes a history part from the chunks of a frame too large for memory.
+
+    add() sorts each chunk by Fake_Id and spills it to a temporary run;
+    write() merges the runs block by block into memory-mapped columns, so
+    about BLOCK_ROWS rows are in memory whatever the number of employees.
+    The result is the part append() writes for the whole frame. Use it as a
+    context manager, which removes the runs.
+    """
+
+    def __init__(self, directory, block_rows=BLOCK_ROWS):
+        os.makedirs(directory, exist_ok=True)
+        self.scratch = tempfile.mkdtemp(prefix='.part-', dir=directory)
+        self.block_rows = block_rows
+        self.runs = []
+        # Behavior label → code, in order of appearance across the chunks
+        self.labels = {}
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def add(self, df):
+        """Spill the recorded columns of one chunk of the processed frame."""
+        frame = df.reindex(columns=[KEY] + METRICS).sort_values(KEY, kind='stable')
+        keys = frame[KEY].to_numpy()
+        if keys.dtype == object:
+            keys = keys.astype(str)
+        for label in frame[LABEL_COLUMN].dropna().unique():
+            self.labels.setdefault(label, len(self.labels))
+        arrays = {KEY: keys, LABEL_COLUMN: frame[LABEL_COLUMN].map(self.labels).fillna(-1).to_numpy(dtype=np.int32)}
+        for metric in METRICS:
+            if metric != LABEL_COLUMN:
+                arrays[metric] = frame[metric].to_numpy(dtype=np.float64)
+        path = os.path.join(self.scratch, f'run-{len(self.runs)}.npz')
+        np.savez(path, **arrays)
+        self.runs.append(path)
+        self.rows += len(frame)
+
+    def _load_runs(self):
+        runs = [read_arrays(path) for path in self.runs]
+        if len({run[KEY].dtype.kind == 'U' for run in runs}) > 1:
+            # Chunks parsed with different id types: order them all as text, like one text column
+            for index, run in enumerate(runs):
+                if run[KEY].dtype.kind != 'U':
+                    keys = run[KEY].astype(str)
+                    order = np.argsort(keys, kind='stable')
+                    path = os.path.join(self.scratch, f'run-{index}-text.npz')
+                    np.savez(path, **{name: (keys if name == KEY else values)[order] for name, values in run.items()})
+                    runs[index] = read_arrays(path)
+        return runs
+
+    def write(self, path):
+        """Merge the runs into the part at path: one row per employee (its first), sorted by Fake_Id."""
+        runs = self._load_runs()
+        categories = sorted(self.labels)
+        names = np.array(categories + [np.nan], dtype=object)
+        # Chunk codes → codes into the sorted categories, -1 (missing) stays last
+        remap = np.full(len(categories) + 1, -1, dtype=smallest_int_dtype(len(categories)))
+        for rank, label in enumerate(categories):
+            remap[self.labels[label]] = rank
+
+        if self.rows <= self.block_rows:
+            frame = pd.DataFrame({name: np.concatenate([run[name] for run in runs]) if runs else []
+                                  for name in [KEY] + METRICS})
+            codes = frame[LABEL_COLUMN].to_numpy(dtype=np.int64)
+            frame[LABEL_COLUMN] = names[remap[codes]] if len(codes) else codes
+            save_snapshot(history_frame(frame), path)
+            return
+
+        key_dtype = np.result_type(*[run[KEY].dtype for run in runs])
+        if key_dtype.kind == 'i':
+            # The narrowest integer type, as save_snapshot() stores the key of a whole frame; runs are sorted
+            bounds = [int(run[KEY][end]) for run in runs if len(run[KEY]) for end in (0, -1)]
+            key_dtype = pd.to_numeric(pd.Series([min(bounds), max(bounds)]), downcast='integer').dtype
+        dtypes = {KEY: key_dtype, LABEL_COLUMN: remap.dtype,
+                  **{metric: np.float64 for metric in METRICS if metric != LABEL_COLUMN}}
+        columns = {
+            name: np.lib.format.open_memmap(os.path.join(self.scratch, f'merged-{index}.npy'), mode='w+',
+                                            dtype=dtypes[name], shape=(self.rows,))
+            for index, name in enumerate([KEY] + METRICS)
+        }
+        lengths = [len(run[KEY]) for run in runs]
+        cursors = [0] * len(runs)
+        window = max(1, self.block_rows // len(runs))
+        written, last = 0, None
+        while True:
+            active = [index for index in range(len(runs)) if cursors[index] < lengths[index]]
+            if not active:
+                break
+            ends = {index: min(cursors[index] + window, lengths[index]) for index in active}
+            # Rows up to the smallest key at which a window stops short of its run are final
+            limits = [runs[index][KEY][ends[index] - 1] for index in active if ends[index] < lengths[index]]
+            stops = {}
+            for index in active:
+                keys = runs[index][KEY][cursors[index]:ends[index]]
+                stops[index] = cursors[index] + (int(np.searchsorted(keys, min(limits), side='right'))
+                                                 if limits else len(keys))
+
+            def take(name):
+                return np.concatenate([runs[index][name][cursors[index]:stops[index]] for index in active])
+
+            keys = take(KEY).astype(key_dtype)
+            # Stable, so among duplicate ids the earliest chunk comes first and is kept
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            keep = np.ones(len(keys), dtype=bool)
+            keep[1:] = keys[1:] != keys[:-1]
+            if last is not None and len(keys):
+                keep[0] = keys[0] != last
+            selected = order[keep]
+            count = len(selected)
+            columns[KEY][written:written + count] = keys[keep]
+            columns[LABEL_COLUMN][written:written + count] = remap[take(LABEL_COLUMN)[selected]]
+            for metric in METRICS:
+                if metric != LABEL_COLUMN:
+                    columns[metric][written:written + count] = take(metric)[selected]
+            if len(keys):
+                last = keys[-1]
+            written += count
+            for index in active:
+                cursors[index] = stops[index]
+
+        encoded = []
+        for name, values in columns.items():
+            values = values[:written]
+            if name == LABEL_COLUMN:
+                encoded.append(('categorical', {'codes': values, 'categories': np.asarray(categories, dtype=str)}, name))
+            elif name == KEY and key_dtype.kind == 'U':
+                encoded.append(('categorical', {'codes': np.arange(written), 'categories': values}, name))
+            else:
+                encoded.append(('numeric', {'values': values}, name))
+        write_snapshot(encoded, written, path)
+        del columns, encoded
+
+
+class HistoryStore:
+    """Append-only per-employee metrics by period, partitioned by month.
+
+    Every training or delta run appends the state of all employees for its
+    period as one immutable part, root/period=YYYY-MM/part-<run id>.npz,
+    sorted by Fake_Id so an employee is found by binary search in the
+    memory-mapped key column. A later part of a period supersedes the
+    earlier ones. index.json names the current part of each period and the
+    rolling aggregates precomputed when the history last changed; readers
+    reload it only when the file changes.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._index_stat = None
+        self._index = {'periods': {}, 'window': [], 'rollups': None}
+        self._rollups = None
+        self._parts = {}
+
+    def partition_dir(self, period):
+        return os.path.join(self.root, PARTITION_PREFIX + period)
+
+    def scan(self):
+        """Current (newest) part of each period, {period: path relative to root}, oldest period first."""
+        if not os.path.isdir(self.root):
+            return {}
+        periods = {}
+        for name in sorted(os.listdir(self.root)):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            parts = sorted(part for part in os.listdir(os.path.join(self.root, name))
+                           if part.startswith('part-') and part.endswith('.npz'))
+            if parts:
+                periods[name[len(PARTITION_PREFIX):]] = f'{name}/{parts[-1]}'
+        return periods
+
+    def append(self, df, run_id, period=None):
+        """Record the employees of a processed frame for period (default: this month) and refresh the rollups."""
+        period = check_period(period or current_period())
+        path = os.path.join(self.partition_dir(period), f'part-{run_id}.npz')
+        save_snapshot(history_frame(df), path)
+        self._update(run_id)
+        return path
+
+    def part_writer(self):
+        """PartWriter recording a frame too large for memory chunk by chunk, see append_part()."""
+        return PartWriter(self.root)
+
+    def append_part(self, writer, run_id, period=None):
+        """Record the chunks added to writer for period (default: this month), like append()."""
+        period = check_period(period or current_period())
+        path = os.path.join(self.partition_dir(period), f'part-{run_id}.npz')
+        writer.write(path)
+        self._update(run_id)
+        return path
+
+    def _update(self, run_id):
+        """Recompute the rollups and rewrite the index after a part was written."""
+        periods = self.scan()
+        # Calendar months, so backfilled or skipped months do not stretch the window over years
+        window = month_range(max(periods), ROLLING_WINDOW)
+        # Only the memory-mapped numeric columns the rollups need
+        parts = [
+            load_snapshot(os.path.join(self.root, periods[name]), columns=[KEY] + ROLLING_METRICS)
+            if name in periods else None
+            for name in window
+        ]
+        rollups_name = f'{ROLLUPS_DIR}/rollups-{run_id}.npz'
+        write_rollups(parts, os.path.join(self.root, rollups_name))
+        write_json({
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'periods': periods,
+            'window': window,
+            'rollups': rollups_name
+        }, os.path.join(self.root, INDEX_FILE))
+        self._prune_rollups(rollups_name)
+
+    def _prune_rollups(self, current, keep=2):
+        """Delete superseded rollups, keeping the previous one for readers still switching over."""
+        directory = os.path.join(self.root, ROLLUPS_DIR)
+        names = sorted(name for name in os.listdir(directory) if name.endswith('.npz'))
+        for name in names[:-keep]:
+            if f'{ROLLUPS_DIR}/{name}' != current:
+                os.unlink(os.path.join(directory, name))
+
+    def _part(self, relative_path):
+        """History frame of a part, memory-mapped and cached since parts never change."""
+        part = self._parts.get(relative_path)
+        if part is None:
+            part = self._parts[relative_path] = load_snapshot(os.path.join(self.root, relative_path))
+        return part
+
+    def _refresh(self):
+        """Reload the index (and the rollups it names) when index.json has changed."""
+        try:
+            stat = os.stat(os.path.join(self.root, INDEX_FILE))
+            index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            index_stat = None
+        if index_stat == self._index_stat:
+            return
+        if index_stat is None:
+            index, rollups = {'periods': {}, 'window': [], 'rollups': None}, None
+        else:
+            with open(os.path.join(self.root, INDEX_FILE)) as f:
+                index = json.load(f)
+            rollups = load_snapshot(os.path.join(self.root, index['rollups'])) if index.get('rollups') else None
+        current = set(index['periods'].values())
+        self._parts = {path: part for path, part in self._parts.items() if path in current}
+        self._index, self._rollups, self._index_stat = index, rollups, index_stat
+
+    def version(self):
+        """Changes whenever the history does, 0 while there is none."""
+        self._refresh()
+        return self._index_stat[1] if self._index_stat else 0
+
+    def periods(self):
+        self._refresh()
+        return list(self._index['periods'])
+
+    def window(self):
+        """Calendar months of the rollup series columns, oldest first, recorded or not."""
+        self._refresh()
+        return list(self._index['window'])
+
+    def rollups(self):
+        """Rolling aggregates per employee of the latest period (see compute_rollups), None without history."""
+        self._refresh()
+        return self._rollups
+
+    def rollup(self, employee_id):
+        """Rolling aggregates of one employee as a dict, None if it is not in the latest period."""
+        rollups = self.rollups()
+        if rollups is None:
+            return None
+        position = find_position(rollups[KEY].to_numpy(), employee_id)
+        return None if position is None else rollups.iloc[position].to_dict()
+
+    def query(self, employee_id, start=None, end=None):
+        """Recorded metrics of one employee for the periods start..end (inclusive), oldest first."""
+        self._refresh()
+        records = []
+        for period, relative_path in self._index['periods'].items():
+            if (start and period < start) or (end and period > end):
+                continue
+            part = self._part(relative_path)
+            position = find_position(part[KEY].to_numpy(), employee_id)
+            if position is not None:
+                record = part.iloc[position].to_dict()
+                record['period'] = period
+                records.append(record)
+        return records
+
+
+if __name__ == '__main__':
+    # python -m src.history_store [list | append <processed .csv/.npz> <YYYY-MM>]
+    from src.artifact_registry import ArtifactRegistry
+    store = HistoryStore(ArtifactRegistry().history_dir)
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if command == 'list':
+        for period, part in store.scan().items():
+            print(f"{period}  {part}")
+    elif command == 'append':
+        # Backfill a period from an older processed export
+        source, period = sys.argv[2], sys.argv[3]
+        df = load_snapshot(source) if source.endswith('.npz') else pd.read_csv(source)
+        print(f"✅ Recorded {len(df)} employees for {period} in {store.append(df, new_run_id(), period)}")
+    else:
+        sys.exit(f"Unknown command {command}, expected list or append")
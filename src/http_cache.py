@@ -0,0 +1,50 @@
+# src/http_cache.py
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used when it is not installed
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed, the headers would eat the savings
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# ETag suffix per content coding, so each representation has its own strong validator
+ETAG_SUFFIXES = {None: '', 'gzip': '-gzip', 'br': '-br'}
+
+
+def available_encodings():
+    """Content codings this server can produce, preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings, size):
+    """Pick the content coding for a body of size bytes, None to send it as is.
+
+    accept_encodings is the request's parsed Accept-Encoding header
+    (werkzeug MIMEAccept-like, supports `quality(name)`).
+    """
+    if size < MIN_COMPRESS_SIZE:
+        return None
+    for encoding in available_encodings():
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    """Compress bytes with the given content coding."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return data
+
+
+def etag_variants(etag):
+    """The ETags every representation of etag may have been sent with."""
+    return [etag + suffix for suffix in ETAG_SUFFIXES.values()]
@@ -0,0 +1,80 @@
+# src/model_selection.py
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from threadpoolctl import threadpool_limits
+
+from src.clustering_model import make_clusterer
+
+# Exact silhouette is O(n^2) in time and memory, so it is scored on a sample
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
+# Set once per worker process by the pool initializer instead of pickling X for every task
+_X = None
+
+
+def _init_worker(X):
+    global _X
+    # One BLAS/OpenMP thread per process, the pool already uses every core
+    threadpool_limits(1)
+    _X = X
+
+
+def evaluate_fit(k, seed, engine='kmeans', n_init=None, max_iter=None, tol=None,
+                 sample_size=SILHOUETTE_SAMPLE_SIZE, X=None):
+    """Fit one (k, seed) candidate and score it; returns (scores, model)."""
+    X = _X if X is None else X
+    model = make_clusterer(k, engine, n_init=n_init, max_iter=max_iter, tol=tol, random_state=seed)
+    labels = model.fit_predict(X)
+    scores = {
+        'k': k,
+        'seed': seed,
+        'engine': engine,
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette_score(
+            X, labels, sample_size=min(sample_size, len(X)), random_state=seed)),
+        'davies_bouldin': float(davies_bouldin_score(X, labels)),
+        'cluster_sizes': np.bincount(labels, minlength=k).tolist()
+    }
+    return scores, model
+
+
+def _evaluate_task(task):
+    return evaluate_fit(*task)
+
+
+def sweep(X, ks, seeds, engine='kmeans', n_init=None, max_iter=None, tol=None,
+          sample_size=SILHOUETTE_SAMPLE_SIZE, workers=None):
+    """Fit and score every (k, seed) pair across a process pool.
+
+    Returns a list of (scores, model) in (k, seed) order.
+    """
+    tasks = [(k, seed, engine, n_init, max_iter, tol, sample_size) for k in ks for seed in seeds]
+    if workers == 1:
+        return [evaluate_fit(*task, X=X) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X,)) as pool:
+        return list(pool.map(_evaluate_task, tasks))
+
+
+def select_best(results):
+    """Pick the fit with the highest silhouette, lower Davies-Bouldin breaking ties."""
+    return max(results, key=lambda result: (result[0]['silhouette'], -result[0]['davies_bouldin']))
+
+
+def sweep_report(results, selected):
+    """The scores of every candidate plus the selected one, saved with the model of the run."""
+    return {
+        'selected': selected[0],
+        'candidates': [scores for scores, _ in results]
+    }
+
+
+def format_report(results, selected):
+    """Plain-text table of the sweep for the console."""
+    lines = [f"{'k':>3} {'seed':>5} {'inertia':>14} {'silhouette':>10} {'davies_bouldin':>14}"]
+    for scores, _ in results:
+        marker = '  <- selected' if scores is selected[0] else ''
+        lines.append(f"{scores['k']:>3} {scores['seed']:>5} {scores['inertia']:>14.1f} "
+                     f"{scores['silhouette']:>10.4f} {scores['davies_bouldin']:>14.4f}{marker}")
+    return '\n'.join(lines)
@@ -0,0 +1,73 @@
+# src/organization_data.py
+import numpy as np
+
+DEPARTMENT_NAMES = {
+    'AL': 'Management',
+    'TDS': 'Technical Delivery',
+    'SSE': 'Senior Engineering',
+    'SE': 'Software Engineering'
+}
+
+DEPARTMENT_KEYS = ['Designation', 'Account_code']
+
+
+def dominant_clusters(df):
+    """Most common Cluster per department, ties going to the lowest cluster id like Series.mode()."""
+    counts = df.groupby(DEPARTMENT_KEYS + ['Cluster']).size().reset_index(name='members')
+    counts = counts.sort_values(
+        DEPARTMENT_KEYS + ['members', 'Cluster'],
+        ascending=[True, True, False, True],
+        kind='stable'
+    )
+    return counts.drop_duplicates(DEPARTMENT_KEYS).set_index(DEPARTMENT_KEYS)['Cluster']
+
+
+def build_organization_data(df, cluster_mapping):
+    """Department-level (Designation, Account_code) aggregates of processed attendance data.
+
+    cluster_mapping maps CSV cluster ids to the website display clusters.
+    """
+    grouped = df.groupby(DEPARTMENT_KEYS).agg(
+        employees=('Fake_Id', 'count'),
+        efficiency=('efficiency', 'mean'),
+        punctuality=('punctuality', 'mean'),
+        bay_hours=('bay_hours', 'mean'),
+        absenteeism_days=('absenteeism_days', 'mean')
+    )
+    grouped['cluster'] = dominant_clusters(df)
+    behavior_types = df.groupby('Cluster')['Behavior_Type'].first()
+    grouped = grouped.reset_index()
+
+    # Convert efficiency and punctuality to percentages when they are decimals
+    for column in ('efficiency', 'punctuality'):
+        grouped[column] = grouped[column].where(grouped[column] > 1, grouped[column] * 100)
+
+    # Calculate attendance rate
+    grouped['attendance'] = (100 - grouped['absenteeism_days'] * 2).fillna(100).clip(0, 100)
+
+    # Determine burnout risk
+    grouped['burnout_risk'] = np.select(
+        [
+            (grouped['efficiency'] < 60) | (grouped['attendance'] < 85),
+            (grouped['efficiency'] < 75) | (grouped['attendance'] < 90)
+        ],
+        ['High', 'Medium'],
+        default='Low'
+    )
+
+    department_names = grouped['Designation'].map(DEPARTMENT_NAMES).fillna('Other')
+    records = {
+        'name': (department_names + ' (' + grouped['Account_code'].astype(str) + ')').tolist(),
+        'accountCode': grouped['Account_code'].tolist(),
+        'designation': grouped['Designation'].tolist(),
+        'employees': grouped['employees'].astype(int).tolist(),
+        'efficiency': grouped['efficiency'].astype(int).tolist(),
+        'attendance': grouped['attendance'].astype(int).tolist(),
+        'punctuality': grouped['punctuality'].astype(int).tolist(),
+        'bayHours': grouped['bay_hours'].round(1).tolist(),
+        'burnoutRisk': grouped['burnout_risk'].tolist(),
+        'cluster': grouped['cluster'].map(cluster_mapping).astype(int).tolist(),
+        'clusterType': grouped['cluster'].map(behavior_types).tolist()
+    }
+    fields = list(records)
+    return [dict(zip(fields, values)) for values in zip(*records.values())]
@@ -0,0 +1,131 @@
+# src/peer_index.py
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+KEY = 'Fake_Id'
+
+# Processed attendance columns ranked against peers, by their website field name
+PEER_METRICS = {
+    'efficiency': 'efficiency',
+    'punctuality': 'punctuality',
+    'bayHours': 'bay_hours',
+    'officeHours': 'avg_office_hours',
+    'breakHours': 'avg_break_hours',
+    'oooHours': 'avg_ooo_hours',
+    'absenteeism_days': 'absenteeism_days',
+    'burnout_hours': 'burnout_hours'
+}
+
+# Peer groups an employee is ranked in, by the column defining them (None: the whole company)
+PEER_GROUPS = {'cluster': 'Behavior_Type', 'designation': 'Designation', 'company': None}
+
+# Percentiles of each metric reported for every peer group
+QUANTILES = (10, 25, 50, 75, 90)
+
+DEFAULT_NEIGHBOURS = 5
+MAX_NEIGHBOURS = 50
+
+# Points per KD-tree leaf; larger leaves build faster, smaller ones query faster
+LEAF_SIZE = 40
+
+
+def finite(value, digits=2):
+    """Round a float for JSON, None for NaN."""
+    return round(value, digits) if value == value else None
+
+
+class PeerIndex:
+    """Percentile ranks and nearest neighbours of the employees of one data snapshot.
+
+    Employees are placed in the clustering model's feature space (imputed
+    with the training medians and scaled with the training scaler) and
+    indexed in a KD-tree, so the most similar employees are found in
+    logarithmic time. Every employee's percentile rank within its cluster,
+    its designation and the company, and the percentiles of each group, are
+    computed up front with one vectorized group-by per group, so a lookup
+    only reads precomputed rows.
+    """
+
+    def __init__(self, df, scaler, medians):
+        df = df.reset_index(drop=True)
+        features = list(scaler.feature_names_in_)
+        missing = [feature for feature in features if feature not in df]
+        if missing:
+            raise ValueError(f"Processed attendance data is missing features: {', '.join(missing)}")
+
+        self.ids = df[KEY].astype(str).tolist()
+        self.positions = {}
+        for position, employee_id in enumerate(self.ids):
+            # The first row of a duplicated id wins, as in the employee lookup
+            self.positions.setdefault(employee_id, position)
+
+        self.points = scaler.transform(df[features].astype(float).fillna(medians[features]))
+        self.tree = KDTree(self.points, leaf_size=LEAF_SIZE)
+
+        metrics = pd.DataFrame({
+            name: pd.to_numeric(df[column], errors='coerce')
+            for name, column in PEER_METRICS.items() if column in df
+        })
+        self.metrics = list(metrics)
+        # Per group: label of each employee, (rows x metrics) percentile ranks,
+        # and {label: (size, {metric: {'p50': value, ...}})}
+        self.groups = {}
+        for group, column in PEER_GROUPS.items():
+            labels = df[column].astype(str).to_numpy() if column else np.full(len(df), 'All')
+            grouped = metrics.groupby(labels)
+            # Share of the group at or below the employee's value
+            ranks = grouped.rank(method='max', pct=True).to_numpy() * 100
+            quantiles = grouped.quantile([q / 100 for q in QUANTILES])
+            sizes = grouped.size()
+            tables = {
+                label: (int(sizes[label]), {
+                    metric: {f'p{q}': finite(value) for q, value in zip(QUANTILES, quantiles.loc[label, metric].tolist())}
+                    for metric in self.metrics
+                })
+                for label in sizes.index
+            }
+            self.groups[group] = (labels, ranks, tables)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def neighbours(self, position, k=DEFAULT_NEIGHBOURS):
+        """Return [(position, distance)] of the k employees nearest to the one at position, nearest first."""
+        count = min(k + 1, len(self.ids))
+        distances, positions = self.tree.query(self.points[position:position + 1], k=count)
+        return [
+            (neighbour, distance)
+            for neighbour, distance in zip(positions[0].tolist(), distances[0].tolist())
+            if neighbour != position
+        ][:k]
+
+    def peers(self, employee_id, k=DEFAULT_NEIGHBOURS):
+        """Peer comparison of one employee, None if it is not in the snapshot.
+
+        Returns {'id', 'groups': {group: {'name', 'size', 'percentiles',
+        'distribution'}}, 'similar': [{'id', 'distance'}]}; percentiles are
+        the employee's ranks (0-100) and distribution the group's QUANTILES
+        of each metric, in the units of the processed attendance data.
+        """
+        position = self.positions.get(employee_id)
+        if position is None:
+            return None
+
+        groups = {}
+        for group, (labels, ranks, tables) in self.groups.items():
+            size, distribution = tables[labels[position]]
+            groups[group] = {
+                'name': labels[position],
+                'size': size,
+                'percentiles': {metric: finite(rank, 1) for metric, rank in zip(self.metrics, ranks[position].tolist())},
+                'distribution': distribution
+            }
+        return {
+            'id': employee_id,
+            'groups': groups,
+            'similar': [
+                {'id': self.ids[neighbour], 'distance': round(distance, 4)}
+                for neighbour, distance in self.neighbours(position, k)
+            ]
+        }
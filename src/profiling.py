@@ -0,0 +1,68 @@
+# src/profiling.py
+import cProfile
+import itertools
+import os
+import random
+import re
+import threading
+import time
+
+try:
+    import pyinstrument
+except ImportError:  # optional, cProfile is used when it is not installed
+    pyinstrument = None
+
+
+class RequestProfiler:
+    """Profiles a random sample of requests, writing one file per profiled request.
+
+    engine 'cprofile' writes .prof files (open with snakeviz or pstats),
+    'pyinstrument' writes an HTML call tree when pyinstrument is installed.
+    Only one request is profiled at a time; requests arriving meanwhile are
+    not sampled.
+    """
+
+    def __init__(self, sample_rate, output_dir, engine='cprofile'):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.engine = 'pyinstrument' if engine == 'pyinstrument' and pyinstrument is not None else 'cprofile'
+        self._lock = threading.Lock()
+        # Keeps file names unique when a route is profiled several times within a second
+        self._sequence = itertools.count()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def start(self):
+        """Start profiling the current request if it is sampled; returns the profiler or None."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        if self.engine == 'pyinstrument':
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def stop(self, profiler, name):
+        """Stop a profiler returned by start() and write its report; returns the file path."""
+        try:
+            slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') or 'request'
+            os.makedirs(self.output_dir, exist_ok=True)
+            stem = os.path.join(self.output_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{os.getpid()}-{next(self._sequence)}")
+            if self.engine == 'pyinstrument':
+                profiler.stop()
+                path = stem + '.html'
+                with open(path, 'w') as f:
+                    f.write(profiler.output_html())
+            else:
+                profiler.disable()
+                path = stem + '.prof'
+                profiler.dump_stats(path)
+            return path
+        finally:
+            self._lock.release()
@@ -0,0 +1,61 @@
+# src/quantile_sketch.py
+import numpy as np
+
+
+class QuantileSketch:
+    """Bounded-memory streaming quantile estimate (a simplified KLL sketch).
+
+    Values are buffered per level; when a level holds more than k values it
+    is sorted and every other value (random offset) moves up one level with
+    twice the weight. Memory stays around k * log2(n / k) values and the
+    rank error is roughly proportional to log2(n / k) / k.
+    NaN values are ignored, as in Series.median().
+    """
+
+    def __init__(self, k=4096, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self.k:
+                self._compact(level)
+            level += 1
+
+    def _compact(self, level):
+        values = np.sort(self.levels[level])
+        # An odd value out stays at this level so no weight is lost
+        keep = len(values) % 2
+        self.levels[level] = values[len(values) - keep:]
+        promoted = values[self._rng.integers(2):len(values) - keep:2]
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantile(self, q):
+        """Estimated q-quantile (0 <= q <= 1) of the values seen, NaN when there are none."""
+        if not self.count:
+            return np.nan
+        if len(self.levels) == 1:
+            # Nothing compacted yet: the exact, interpolated quantile like Series.quantile()
+            return float(np.quantile(self.levels[0], q))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(values[order][min(position, len(values) - 1)])
+
+    def median(self):
+        return self.quantile(0.5)
@@ -0,0 +1,130 @@
+# src/recommendation_service.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from src.metrics import record_cache
+
+READY = 'ready'
+PENDING = 'pending'
+
+
+def inputs_digest(inputs):
+    """Stable digest of the prompt inputs for an employee."""
+    encoded = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, max_size=1024, ttl=3600, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RecommendationService:
+    """Cached, coalesced and concurrency-limited access to an LLM recommendation generator.
+
+    generate(employee) returns a list of recommendations, or None when the
+    LLM call failed. inputs(employee) returns the employee's prompt inputs;
+    results are cached by behavior cluster plus a hash of those inputs, so
+    employees with identical inputs share one call. Concurrent requests for
+    the same key wait on a single in-flight call, and at most max_concurrent
+    calls run at once.
+    """
+
+    def __init__(self, generate, inputs, max_concurrent=4, cache_size=1024, ttl=6 * 3600,
+                 failure_ttl=60):
+        self.generate = generate
+        self.inputs = inputs
+        self.cache = TTLCache(cache_size, ttl)
+        # Failed calls are remembered briefly so an outage is not retried on every request
+        self.failure_ttl = failure_ttl
+        self.limit = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent,
+                                            thread_name_prefix='recommendations')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def key(self, employee):
+        """Cache key: behavior cluster plus a digest of the prompt inputs."""
+        return f"{employee.get('clusterType', 'Unknown')}:{inputs_digest(self.inputs(employee))}"
+
+    def call(self, employee):
+        """Run generate() directly, holding one of the concurrency slots."""
+        with self.limit:
+            return self.generate(employee)
+
+    def _run(self, key, employee):
+        try:
+            result = self.call(employee)
+            self.cache.set(key, result, None if result else self.failure_ttl)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def submit(self, employee):
+        """Return (key, future) for employee, joining an in-flight call for the same key."""
+        key = self.key(employee)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._run, key, employee)
+                self._inflight[key] = future
+        return key, future
+
+    def get(self, employee, wait=None):
+        """Return (status, key, recommendations).
+
+        status is READY with the (possibly empty) result, or PENDING when the
+        call is still running after waiting wait seconds (None waits for it).
+        """
+        key = self.key(employee)
+        missing = object()
+        cached = self.cache.get(key, missing)
+        record_cache('recommendations', cached is not missing)
+        if cached is not missing:
+            return READY, key, cached
+
+        key, future = self.submit(employee)
+        try:
+            return READY, key, future.result(timeout=wait)
+        except TimeoutError:
+            return PENDING, key, None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
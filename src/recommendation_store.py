@@ -0,0 +1,77 @@
+# src/recommendation_store.py
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    employee_id TEXT PRIMARY KEY,
+    inputs_digest TEXT NOT NULL,
+    recommendations TEXT NOT NULL,
+    generated_at REAL NOT NULL
+)
+"""
+
+
+class RecommendationStore:
+    """SQLite store of pre-generated recommendations keyed by employee id.
+
+    Each row keeps the digest of the prompt inputs it was generated from, so
+    readers can tell whether it still matches the employee's current metrics.
+    The web app only reads; the batch job writes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _reader(self):
+        # One read-only connection per thread, opened lazily since the database may not exist yet
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            self._local.connection = connection
+        return connection
+
+    def get(self, employee_id):
+        """Return (inputs_digest, recommendations) for employee_id, or None."""
+        try:
+            row = self._reader().execute(
+                'SELECT inputs_digest, recommendations FROM recommendations WHERE employee_id = ?',
+                (employee_id,)
+            ).fetchone()
+        except sqlite3.Error:
+            # Missing database or table: drop the connection and retry on the next call
+            connection = getattr(self._local, 'connection', None)
+            if connection is not None:
+                connection.close()
+            self._local.connection = None
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def open_writer(self):
+        """Open a read-write connection, creating the database if needed."""
+        connection = sqlite3.connect(self.path)
+        # WAL lets the web app keep reading while a batch run writes
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(SCHEMA)
+        return connection
+
+    @staticmethod
+    def digests(connection):
+        """Map of employee id to the inputs digest of its stored recommendations."""
+        return dict(connection.execute('SELECT employee_id, inputs_digest FROM recommendations'))
+
+    @staticmethod
+    def put_many(connection, rows):
+        """Insert or replace (employee_id, inputs_digest, recommendations) rows."""
+        now = time.time()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?)',
+                [(employee_id, digest, json.dumps(recommendations), now)
+                 for employee_id, digest, recommendations in rows]
+            )
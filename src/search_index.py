@@ -0,0 +1,185 @@
+# src/search_index.py
+import sys
+
+import numpy as np
+
+SEARCH_FIELDS = ('id', 'name', 'designation')
+
+# Substrings up to this length are indexed directly, longer queries intersect their trigrams
+GRAM_SIZE = 3
+
+# Texts whose n-grams are generated at once, bounding the temporary key arrays
+BLOCK_ROWS = 65536
+
+# Bits available to a packed (n-gram, position) pair
+PAIR_BITS = 63
+
+
+def ngrams(text, size):
+    """Return the set of substrings of the given size."""
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def changes(values):
+    """Boolean mask of the elements of a sorted array that differ from the previous one."""
+    mask = np.ones(len(values), dtype=bool)
+    np.not_equal(values[1:], values[:-1], out=mask[1:])
+    return mask
+
+
+def name_words(names):
+    """Return (words, position of the name each came from) of an array of names."""
+    words = [name.split() for name in names.tolist()]
+    positions = np.repeat(np.arange(len(names), dtype=np.int32), [len(name_words) for name_words in words])
+    return np.asarray([word for name_words in words for word in name_words], dtype=str), positions
+
+
+def sorted_texts(texts, positions):
+    """Sort texts, with the position each came from; equal texts keep their order."""
+    order = np.argsort(texts, kind='stable')
+    return texts[order], positions[order]
+
+
+class SearchIndex:
+    """Lowercased n-gram and prefix index over employee id, name and designation.
+
+    Results are ranked exact id match first, then prefix matches (of a field
+    or of a word in the name), then other substring matches. Ties keep the
+    original employee order.
+
+    Every substring of up to GRAM_SIZE characters maps to a sorted array of
+    the positions containing it, all stored in one array; longer queries
+    intersect the arrays of their trigrams. Prefixes are found by binary
+    search in sorted copies of the fields and of the name words. Matches
+    come out in employee order, so a page is sliced without sorting them.
+    The index is built with vectorized numpy operations over the character
+    codes, not per employee.
+    """
+
+    def __init__(self, employees):
+        self.employees = employees
+        positions = np.arange(len(employees), dtype=np.int32)
+        # Fixed-width arrays, to confirm long queries and as the source of the character codes
+        self.fields = [
+            np.asarray([value.lower() if isinstance(value, str) else '' for value in (emp.get(field) for emp in employees)],
+                       dtype=str)
+            for field in SEARCH_FIELDS
+        ]
+        # (sorted texts, their positions) of the fields, the id first, and of the name words
+        self.starts = [sorted_texts(field, positions) for field in self.fields]
+        self.starts.append(sorted_texts(*name_words(self.fields[1])))
+
+        self._index_grams()
+
+    def _index_grams(self):
+        # (employees x characters) code points of each field, 0-padded
+        codes = [field.view(np.uint32).reshape(len(field), field.itemsize // 4) for field in self.fields]
+
+        # Characters are renumbered 1..n (0 is padding), so an n-gram and a position pack into one integer
+        used = np.bincount(np.concatenate([matrix.ravel() for matrix in codes]), minlength=1)
+        used[0] = 1
+        alphabet = np.flatnonzero(used)
+        self.ranks = {chr(code): rank for rank, code in enumerate(alphabet.tolist()) if rank}
+        self.char_bits = (len(alphabet) - 1).bit_length()
+        position_bits = max(len(self.employees) - 1, 1).bit_length()
+        if GRAM_SIZE * self.char_bits + position_bits > PAIR_BITS:
+            raise ValueError(f"Cannot index {len(alphabet) - 1} distinct characters over {len(self.employees)} employees")
+
+        pairs = []
+        for matrix in codes:
+            for start in range(0, len(matrix), BLOCK_ROWS):
+                ranks = np.searchsorted(alphabet, matrix[start:start + BLOCK_ROWS]).astype(np.int64)
+                rows = np.arange(start, start + len(ranks), dtype=np.int64)
+                for size in range(1, GRAM_SIZE + 1):
+                    for offset in range(ranks.shape[1] - size + 1):
+                        present = ranks[:, offset + size - 1] != 0
+                        key = np.zeros(int(present.sum()), dtype=np.int64)
+                        for index in range(GRAM_SIZE):
+                            key <<= self.char_bits
+                            if index < size:
+                                key |= ranks[present, offset + index]
+                        pairs.append((key << position_bits) | rows[present])
+
+        # Sorted by n-gram then position, a gram repeated in one employee's texts counted once
+        pairs = np.concatenate(pairs) if pairs else np.empty(0, dtype=np.int64)
+        pairs.sort()
+        pairs = pairs[changes(pairs)]
+        self.postings = (pairs & ((1 << position_bits) - 1)).astype(np.int32)
+        keys = np.right_shift(pairs, position_bits, out=pairs)
+        firsts = np.flatnonzero(changes(keys))
+        self.keys = keys[firsts]
+        self.bounds = np.append(firsts, len(keys))
+
+    def _postings(self, gram):
+        """Sorted positions whose texts contain gram, at most GRAM_SIZE characters long."""
+        key = 0
+        for index in range(GRAM_SIZE):
+            rank = self.ranks.get(gram[index]) if index < len(gram) else 0
+            if rank is None:
+                return self.postings[:0]
+            key = (key << self.char_bits) | rank
+
+        found = int(np.searchsorted(self.keys, key))
+        if found == len(self.keys) or self.keys[found] != key:
+            return self.postings[:0]
+        return self.postings[self.bounds[found]:self.bounds[found + 1]]
+
+    def _substring_matches(self, query):
+        if len(query) <= GRAM_SIZE:
+            return self._postings(query)
+
+        # Every trigram of the query must occur in the text, then confirm the full substring
+        postings = sorted((self._postings(gram) for gram in ngrams(query, GRAM_SIZE)), key=len)
+        candidates = postings[0]
+        for other in postings[1:]:
+            if not len(candidates):
+                break
+            # Binary search of the fewest candidates in the longer sorted postings
+            found = np.minimum(np.searchsorted(other, candidates), len(other) - 1)
+            candidates = candidates[other[found] == candidates]
+
+        confirmed = np.zeros(len(candidates), dtype=bool)
+        for field in self.fields:
+            # Fields shorter than the query cannot contain it
+            if field.itemsize // 4 >= len(query):
+                confirmed |= np.char.find(field[candidates], query) >= 0
+        return candidates[confirmed]
+
+    def _prefixed(self, query):
+        """Boolean mask of the positions with a field or a name word starting with query."""
+        mask = np.zeros(len(self.employees), dtype=bool)
+        last = ord(query[-1])
+        after = query[:-1] + chr(last + 1) if last < sys.maxunicode else None
+        for texts, positions in self.starts:
+            low = np.searchsorted(texts, query)
+            high = np.searchsorted(texts, after) if after is not None else len(texts)
+            mask[positions[low:high]] = True
+        return mask
+
+    def _exact(self, query):
+        """First position whose id is query, None if there is none."""
+        ids, positions = self.starts[0]
+        found = int(np.searchsorted(ids, query))
+        if found < len(ids) and ids[found] == query:
+            return int(positions[found])
+        return None
+
+    def search(self, query, limit=None, offset=0):
+        """Return (total matches, ranked page of employee records) for query."""
+        query = query.lower()
+        matches = self._substring_matches(query) if query else []
+        if not len(matches):
+            return 0, []
+
+        exact = self._exact(query)
+        rest = matches if exact is None else matches[matches != exact]
+        prefixed = self._prefixed(query)[rest]
+
+        # Only the first offset + limit of each group can reach the page
+        end = len(matches) if limit is None else offset + limit
+        ranked = np.concatenate((
+            [exact] if exact is not None else [],
+            rest[prefixed][:end],
+            rest[~prefixed][:end]
+        )).astype(np.int64)
+        return len(matches), [self.employees[position] for position in ranked[offset:end].tolist()]
@@ -0,0 +1,159 @@
+# src/synthetic_attendance.py
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column order of the raw attendance export
+RAW_COLUMNS = [
+    'Fake_Id', 'Designation', 'Recruitment_Type', 'Account_code', 'Avg_In_Tim', 'Avg_Out_Tim',
+    'Avg_Office_hr', 'Avg_Bay_hr', 'Avg_Break_hr', 'Avg_Cafeteria', 'Avg_OOO_hr', 'Unbilled',
+    'Half_Day', 'Full_Day', 'Online_Checkin', 'Exemptions', 'Unallocated'
+]
+
+# Behavior segments the rows are drawn from, with their share of employees and the
+# (mean, std) of each measure, taken per behavior type from data/processed_attendance.csv.
+# Times are in hours, efficiency is bay hours as a percentage of office hours, the
+# leave and exemption counts are means of over-dispersed (negative binomial) counts.
+SEGMENTS = [
+    {
+        'name': 'Consistent Performer', 'share': 0.06,
+        'in_time': (12.05, 1.64), 'office': (9.30, 1.12), 'efficiency': (79.1, 10.3),
+        'break': (1.84, 0.52), 'cafeteria': (0.51, 0.25), 'ooo': (1.33, 0.51),
+        'half_day': 2.6, 'full_day': 20.7, 'exemptions': 17.6, 'unbilled': 0.99, 'unallocated': 0.95
+    },
+    {
+        'name': 'Silent Overworker', 'share': 0.19,
+        'in_time': (12.75, 0.77), 'office': (9.21, 0.85), 'efficiency': (71.7, 8.5),
+        'break': (2.56, 0.59), 'cafeteria': (0.65, 0.35), 'ooo': (1.90, 0.67),
+        'half_day': 2.7, 'full_day': 12.4, 'exemptions': 21.9, 'unbilled': 0.43, 'unallocated': 0.01
+    },
+    {
+        'name': 'Late Starter', 'share': 0.59,
+        'in_time': (12.63, 0.79), 'office': (9.26, 0.59), 'efficiency': (82.5, 4.6),
+        'break': (1.60, 0.33), 'cafeteria': (0.59, 0.28), 'ooo': (1.00, 0.30),
+        'half_day': 2.0, 'full_day': 10.7, 'exemptions': 16.5, 'unbilled': 0.37, 'unallocated': 0.0
+    },
+    {
+        'name': 'Erratic / At-Risk', 'share': 0.16,
+        'in_time': (10.76, 1.41), 'office': (9.93, 0.60), 'efficiency': (84.5, 3.6),
+        'break': (1.53, 0.35), 'cafeteria': (0.56, 0.26), 'ooo': (0.96, 0.33),
+        'half_day': 1.5, 'full_day': 10.5, 'exemptions': 9.8, 'unbilled': 0.31, 'unallocated': 0.0
+    }
+]
+
+DESIGNATIONS = {'TDS': 0.86, 'AL': 0.13, 'Con': 0.01}
+
+RECRUITMENT_TYPES = {
+    'Campus-2023': 0.31, 'Campus-2022': 0.24, 'Campus 2024': 0.20, 'Ragnarok TDS2': 0.11,
+    'Campus-2021': 0.04, 'Lateral': 0.03, 'Campus-2020': 0.02, 'Campus-2019': 0.02,
+    'MAAL 2024': 0.01, 'Campus 2025': 0.01, 'Agency': 0.01
+}
+
+ACCOUNT_CODES = {
+    'Mars': 0.18, 'CHEVRON U.S.A. INC.': 0.12, 'Bristol-Myers Squibb': 0.11, 'Home Depot': 0.08,
+    'Microsoft': 0.07, 'J&J Inc': 0.07, 'Abbvie': 0.06, 'Walmart': 0.05, 'Southwest': 0.04,
+    'Loyalty Pacific': 0.04, 'SABIC': 0.04, 'Engineering Improvement': 0.04, 'Skills Development': 0.03,
+    'Chevron India': 0.03, 'Gilead Sciences, Inc.': 0.04
+}
+
+# Most employees never check in online, the rest do so a handful of times
+ONLINE_CHECKIN_SHARE = 0.16
+ONLINE_CHECKIN_MEAN = 11.0
+
+# Dispersion of the leave and exemption counts (smaller is more skewed)
+COUNT_DISPERSION = 1.5
+
+# "H:MM:SS" for every second of the day, so formatting a column is a single lookup
+TIME_STRINGS = np.array([f"{s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(24 * 3600)], dtype=object)
+
+
+def format_hours(hours):
+    """Format float hours (wrapped into one day) as "H:MM:SS" strings like the export."""
+    seconds = np.rint(np.asarray(hours) * 3600).astype(np.int64) % (24 * 3600)
+    return TIME_STRINGS[seconds]
+
+
+def choose(rng, weights, size):
+    values = list(weights)
+    p = np.array(list(weights.values()), dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=p / p.sum())]
+
+
+def counts(rng, means):
+    """Negative binomial counts with the given per-row means."""
+    means = np.maximum(np.asarray(means, dtype=float), 1e-9)
+    return rng.negative_binomial(COUNT_DISPERSION, COUNT_DISPERSION / (COUNT_DISPERSION + means))
+
+
+def generate_attendance(rows, seed=0):
+    """Generate a raw attendance export of rows employees, same seed same data.
+
+    Each employee is drawn from one of the behavior SEGMENTS, so the data
+    clusters like the real export; the result has the RAW_COLUMNS schema and
+    goes through preprocess_attendance() unchanged.
+    """
+    rng = np.random.default_rng(seed)
+    shares = np.array([segment['share'] for segment in SEGMENTS])
+    segment_ids = rng.choice(len(SEGMENTS), size=rows, p=shares / shares.sum())
+
+    def param(key, position=None):
+        values = np.array([segment[key] if position is None else segment[key][position] for segment in SEGMENTS])
+        return values[segment_ids]
+
+    def normal(key, low, high):
+        return np.clip(rng.normal(param(key, 0), param(key, 1)), low, high)
+
+    in_time = normal('in_time', 6.0, 18.0)
+    office = normal('office', 4.0, 14.0)
+    bay = office * normal('efficiency', 30.0, 100.0) / 100
+    online = np.where(rng.random(rows) < ONLINE_CHECKIN_SHARE, rng.geometric(1 / ONLINE_CHECKIN_MEAN, rows), 0)
+
+    df = pd.DataFrame({
+        'Fake_Id': np.arange(rows),
+        'Designation': choose(rng, DESIGNATIONS, rows),
+        'Recruitment_Type': choose(rng, RECRUITMENT_TYPES, rows),
+        'Account_code': choose(rng, ACCOUNT_CODES, rows),
+        'Avg_In_Tim': format_hours(in_time),
+        'Avg_Out_Tim': format_hours(in_time + office),
+        'Avg_Office_hr': format_hours(office),
+        'Avg_Bay_hr': format_hours(bay),
+        'Avg_Break_hr': format_hours(normal('break', 0.0, 8.0)),
+        'Avg_Cafeteria': format_hours(normal('cafeteria', 0.0, 2.0)),
+        'Avg_OOO_hr': format_hours(normal('ooo', 0.0, 7.0)),
+        'Unbilled': np.where(rng.random(rows) < param('unbilled'), 'Unbilled', 'Billed'),
+        'Half_Day': counts(rng, param('half_day')),
+        'Full_Day': counts(rng, param('full_day')),
+        'Online_Checkin': online,
+        'Exemptions': counts(rng, param('exemptions')),
+        'Unallocated': np.where(rng.random(rows) < param('unallocated'), 'Yes', 'No')
+    })
+    return df[RAW_COLUMNS]
+
+
+def write_attendance(df, path):
+    """Write a raw export as .csv, .parquet or .xlsx, the formats read_attendance() reads."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        df.to_csv(path, index=False)
+    elif extension in ('.parquet', '.pq'):
+        df.to_parquet(path, index=False)
+    elif extension in ('.xlsx', '.xlsm'):
+        df.to_excel(path, index=False)
+    else:
+        raise ValueError(f"Unsupported attendance file format: {path}")
+
+
+if __name__ == '__main__':
+    # python -m src.synthetic_attendance 100000 data/synthetic_100k.csv
+    parser = argparse.ArgumentParser(description="Generate a synthetic raw attendance export")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output', help='.csv, .parquet or .xlsx file to write')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_attendance(generate_attendance(args.rows, args.seed), args.output)
+    print(f"✅ Wrote {args.rows} synthetic employees to {args.output}")
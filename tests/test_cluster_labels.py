@@ -0,0 +1,72 @@
+# tests/test_cluster_labels.py
+# Labelling clusters by matching their centroids to the reference behavior profiles:
+#   python -m pytest tests
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from src.cluster_labels import LEGACY_LABELS, REFERENCE_PROFILES, add_radii, assign_labels, cluster_radii, load_labels
+
+PROFILES = pd.DataFrame([profile['profile'] for profile in REFERENCE_PROFILES])
+LABELS = [profile['label'] for profile in REFERENCE_PROFILES]
+
+
+@pytest.fixture(scope='module')
+def scaler():
+    rng = np.random.default_rng(0)
+    samples = PROFILES.loc[rng.integers(len(PROFILES), size=400)].reset_index(drop=True)
+    samples = samples * rng.normal(1, 0.1, samples.shape)
+    return StandardScaler().fit(samples)
+
+
+def centers_near(scaler, profiles, rng, noise=0.05):
+    """Scaled centroids close to the given unscaled profiles."""
+    return scaler.transform(profiles) + rng.normal(0, noise, (len(profiles), len(PROFILES.columns)))
+
+
+def test_labels_follow_the_behavior(scaler):
+    rng = np.random.default_rng(1)
+    order = [2, 0, 3, 1]
+    labels = assign_labels(centers_near(scaler, PROFILES.loc[order], rng), scaler)
+
+    assert list(labels) == [0, 1, 2, 3]
+    assert [labels[cluster]['label'] for cluster in labels] == [LABELS[index] for index in order]
+    assert [labels[cluster]['display'] for cluster in labels] == [REFERENCE_PROFILES[index]['display'] for index in order]
+    assert all(entry['distance'] < 1 for entry in labels.values())
+
+
+def test_more_clusters_than_profiles(scaler):
+    rng = np.random.default_rng(2)
+    # The reference profiles at clusters 1, 2, 4 and 5, two far-off centroids at 0 and 3
+    far = PROFILES.loc[[0, 0]] * 3
+    profiles = pd.concat([far.iloc[:1], PROFILES.loc[[3, 1]], far.iloc[1:], PROFILES.loc[[0, 2]]])
+    labels = assign_labels(centers_near(scaler, profiles, rng), scaler)
+
+    assert [labels[cluster]['label'] for cluster in (1, 2, 4, 5)] == [LABELS[3], LABELS[1], LABELS[0], LABELS[2]]
+    assert labels[0] == {'label': 'Cluster 0', 'display': 5, 'distance': None}
+    assert labels[3] == {'label': 'Cluster 3', 'display': 6, 'distance': None}
+
+
+def test_fewer_clusters_than_profiles(scaler):
+    rng = np.random.default_rng(3)
+    labels = assign_labels(centers_near(scaler, PROFILES.loc[[3, 1]], rng), scaler)
+    assert {cluster: entry['label'] for cluster, entry in labels.items()} == {0: LABELS[3], 1: LABELS[1]}
+
+
+def test_radii():
+    radii = cluster_radii([0, 0, 1, 1, 1], np.array([1.0, 3.0, 2.0, 2.0, 10.0]))
+    assert radii[0] == pytest.approx(2.9) and radii[1] == pytest.approx(9.2)
+    labels = add_radii({0: {}, 1: {}, 2: {}}, radii)
+    assert labels[0]['radius'] == pytest.approx(2.9) and labels[2]['radius'] is None
+
+
+def test_load_labels(tmp_path):
+    path = tmp_path / 'cluster_labels.json'
+    assert load_labels(str(path)) == LEGACY_LABELS
+    path.write_text(json.dumps({'0': {'label': 'A', 'display': 1}}))
+    assert load_labels(str(path)) == {0: {'label': 'A', 'display': 1}}
+    path.write_text('{not json')
+    assert load_labels(str(path)) == LEGACY_LABELS
@@ -0,0 +1,92 @@
+# tests/test_delta_update.py
+# Merging a delta export into the processed data and the drift report published with it:
+#   python -m pytest tests
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.artifact_registry import DATA_FILE, ArtifactRegistry
+from src.clustering_model import run_clustering
+from src.data_preprocessing import preprocess_attendance
+from src.delta_update import KEY, apply_delta, drift_report, merge_delta
+from src.history_store import HistoryStore
+from src.synthetic_attendance import generate_attendance, write_attendance
+
+
+def test_merge_replaces_and_appends():
+    processed = pd.DataFrame({KEY: [1, 2, 3, 4], 'efficiency': [10.0, 20.0, 30.0, 40.0], 'Name': list('abcd')})
+    # Id 3 twice (the last wins), 2 updated, 9 new; the delta has no Name but a new column
+    delta = pd.DataFrame({KEY: [3, 2, 9, 3], 'efficiency': [31.0, 21.0, 90.0, 33.0], 'extra': [1, 2, 3, 4]})
+    merged = merge_delta(processed, delta)
+
+    assert merged[KEY].tolist() == [1, 2, 3, 4, 9]
+    assert merged['efficiency'].tolist() == [10.0, 21.0, 33.0, 40.0, 90.0]
+    # Columns the delta lacks keep their values, new rows have none
+    assert merged['Name'].tolist()[:4] == list('abcd') and pd.isna(merged['Name'].iloc[4])
+    assert merged['extra'].iloc[[1, 2, 4]].tolist() == [2, 4, 3] and merged['extra'].iloc[[0, 3]].isna().all()
+
+
+def test_merge_matches_keys_as_text():
+    processed = pd.DataFrame({KEY: [1, 2], 'efficiency': [10.0, 20.0]})
+    delta = pd.DataFrame({KEY: ['2'], 'efficiency': [25.0]})
+    assert merge_delta(processed, delta)['efficiency'].tolist() == [10.0, 25.0]
+
+
+def test_drift_report():
+    labels = {0: {'label': 'A', 'radius': 1.0}, 1: {'label': 'B', 'radius': 2.0}}
+    delta = pd.DataFrame({'Cluster': [0, 0, 1, 1]})
+    report = drift_report(delta, np.array([0.5, 1.5, 1.0, 3.0]), labels, total_rows=100)
+    assert report['changed_rows'] == 4 and report['changed_share'] == 0.04
+    assert report['outlier_share'] == 0.5
+    assert report['drift'] and len(report['reasons']) == 1 and 'outside their cluster radius' in report['reasons'][0]
+
+    report = drift_report(delta, np.zeros(4), labels, total_rows=10)
+    assert report['outlier_share'] == 0.0
+    assert report['drift'] and 'rows changed' in report['reasons'][0]
+
+    # Models saved without radii cannot judge outliers
+    report = drift_report(delta, np.zeros(4), {0: {'label': 'A'}, 1: {'label': 'B'}}, total_rows=100)
+    assert report['outlier_share'] is None and not report['drift']
+
+
+@pytest.fixture
+def trained(tmp_path, monkeypatch):
+    # The registry and legacy directories are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    raw = generate_attendance(400, seed=3)
+    write_attendance(raw, 'raw.csv')
+    df, X_scaled, scaler, _ = preprocess_attendance('raw.csv')
+    run_clustering(df, X_scaled, k=4, scaler=scaler, period='2026-01')
+    return raw
+
+
+def test_apply_delta(trained):
+    registry = ArtifactRegistry()
+    parent = registry.current()
+    before = pd.read_csv(f'artifacts/runs/{parent}/{DATA_FILE}')
+
+    # 30 changed employees and 10 new ones
+    changed = trained.head(30).copy()
+    changed['Avg_Office_hr'] = '12:00'
+    added = generate_attendance(10, seed=4).assign(Fake_Id=lambda frame: frame['Fake_Id'] + 1000)
+    write_attendance(pd.concat([changed, added]), 'delta.csv')
+
+    merged, report, manifest = apply_delta('delta.csv', registry, period='2026-02')
+
+    assert len(merged) == 410 and merged[KEY].tolist() == before[KEY].tolist() + list(range(1000, 1010))
+    assert (merged['avg_office_hours'].iloc[:30] == 12.0).all()
+    pd.testing.assert_frame_equal(merged.iloc[30:400].reset_index(drop=True)[before.columns],
+                                  before.iloc[30:].reset_index(drop=True), check_dtype=False)
+    assert merged['Behavior_Type'].notna().all()
+
+    assert report['changed_rows'] == 40 and report['total_rows'] == 410
+    assert report['changed_share'] == pytest.approx(40 / 410)
+    assert report['drift'] == bool(report['reasons'])
+
+    # Published as the current run with the drift report, and recorded in the history
+    assert registry.current() == manifest['run_id'] != parent
+    assert manifest['parent'] == parent and manifest['delta'] == report and manifest['rows'] == 410
+    assert registry.verify(manifest['run_id']) == []
+    published = pd.read_csv(f"artifacts/runs/{manifest['run_id']}/{DATA_FILE}")
+    assert published[KEY].tolist() == merged[KEY].tolist()
+    assert HistoryStore(registry.history_dir).periods() == ['2026-01', '2026-02']
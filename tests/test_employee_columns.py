@@ -0,0 +1,122 @@
+# tests/test_employee_columns.py
+# Parity of the vectorized employee transform with the original row-by-row loop:
+#   python -m pytest tests
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed_attendance.csv')
+
+# Cluster mapping the original loop hard-coded
+LEGACY_CLUSTER_MAPPING = {0: 1, 1: 3, 2: 4, 3: 2}
+
+# Simulated by the original loop, recorded in the attendance history since
+HISTORY_FIELDS = ('monthly', 'trend')
+
+
+def legacy_employees(df):
+    """The original load_attendance_data() loop, without the monthly series and trend."""
+    employees = []
+    for _, row in df.iterrows():
+        efficiency = float(row['efficiency'])
+        if efficiency <= 1:
+            efficiency = efficiency * 100
+
+        punctuality = float(row['punctuality'])
+        if punctuality <= 1:
+            punctuality = punctuality * 100
+
+        attendance = 100 - (float(row['absenteeism_days']) * 2)
+        attendance = max(0, min(100, attendance))
+
+        name = row['Name'] if pd.notna(row['Name']) else f"Employee {row['Fake_Id']}"
+
+        employees.append({
+            'id': str(row['Fake_Id']),
+            'name': name,
+            'designation': row['Designation'],
+            'efficiency': int(efficiency),
+            'attendance': int(attendance),
+            'bayHours': round(float(row['bay_hours']), 1),
+            'cafeteriaHours': float(row.get('cafeteria_hours', 0)),
+            'oooHours': float(row.get('avg_ooo_hours', 0)),
+            'officeHours': float(row.get('avg_office_hours', 0)),
+            'breakHours': float(row.get('avg_break_hours', 0)),
+            'score': int(efficiency),
+            'cluster': LEGACY_CLUSTER_MAPPING[int(row['Cluster'])],
+            'clusterType': row['Behavior_Type'],
+            'punctuality': int(punctuality),
+            'accountCode': row['Account_code'],
+            'recruitment_type': row['Recruitment_Type'],
+            'absenteeism_days': float(row.get('absenteeism_days', 0)),
+            'burnout_hours': float(row.get('burnout_hours', 0))
+        })
+    return employees
+
+
+def vectorized_employees(df, rollups=None):
+    columns = app.build_employee_columns(df, LEGACY_CLUSTER_MAPPING, rollups)
+    fields = list(columns)
+    return [dict(zip(fields, values)) for values in zip(*columns.values())]
+
+
+def without_history(employees):
+    return [{key: value for key, value in emp.items() if key not in HISTORY_FIELDS} for emp in employees]
+
+
+@pytest.fixture(scope='module')
+def processed():
+    return pd.read_csv(CSV_PATH)
+
+
+def test_matches_legacy_loop(processed):
+    expected = legacy_employees(processed)
+    actual = vectorized_employees(processed)
+    assert without_history(actual) == expected
+    # Same JSON too, i.e. the same int/float types field for field
+    assert json.dumps(without_history(actual)) == json.dumps(expected)
+
+
+def test_matches_legacy_loop_on_edge_cases(processed):
+    df = processed.head(200).copy()
+    # Decimal percentages, missing names and attendance clamped at both ends
+    df.loc[:49, 'efficiency'] = df.loc[:49, 'efficiency'] / 100
+    df.loc[:49, 'punctuality'] = 0.5
+    df.loc[50:99, 'Name'] = np.nan
+    df.loc[100:109, 'absenteeism_days'] = 80
+    df.loc[110:119, 'absenteeism_days'] = -5
+    df = df.drop(columns=['cafeteria_hours', 'burnout_hours'])
+    assert json.dumps(without_history(vectorized_employees(df))) == json.dumps(legacy_employees(df))
+
+
+def test_without_history(processed):
+    employees = vectorized_employees(processed.head(20))
+    assert [emp['monthly'] for emp in employees] == [[emp['efficiency']] for emp in employees]
+    assert all(emp['trend'] == 0 for emp in employees)
+
+
+def test_missing_values_are_null(processed):
+    # The original loop failed on these rows (int(nan)) and served mock data instead
+    df = processed.head(20).copy()
+    df.loc[0, 'punctuality'] = np.nan
+    df.loc[1, ['efficiency', 'bay_hours', 'avg_office_hours']] = np.nan
+    employees = vectorized_employees(df)
+
+    assert employees[0]['punctuality'] is None
+    assert employees[1]['efficiency'] is None and employees[1]['score'] is None
+    assert employees[1]['bayHours'] is None and employees[1]['officeHours'] is None
+    assert employees[1]['monthly'] == [] and employees[1]['trend'] == 0
+    # Other rows are untouched
+    assert without_history(employees[2:]) == legacy_employees(df.iloc[2:])
+    # Valid JSON, no NaN
+    json.dumps(employees, allow_nan=False)
+
+    frame = pd.DataFrame.from_records(employees, exclude=['monthly'])
+    summary = app.build_dashboard_summary(frame)
+    assert 0 <= summary['averages']['punctuality'] <= 100
+    assert 0 <= summary['averages']['efficiency'] <= 100
@@ -0,0 +1,107 @@
+# tests/test_employee_query.py
+# Filtering, sorting and cursor paging of /api/employees against a plain Python reference:
+#   python -m pytest tests
+import math
+
+import pytest
+
+import app
+from src.employee_query import QueryError, decode_cursor, encode_cursor
+
+PAGE_SIZE = 97
+
+
+@pytest.fixture(scope='module')
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture(scope='module')
+def employees():
+    return app.employee_store.get().employees
+
+
+def missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def reference(employees, keep=lambda emp: True, sort=None):
+    """Ids of the matching employees in the order a full stable sort gives, missing values last."""
+    matching = [emp for emp in employees if keep(emp)]
+    if sort:
+        field = sort.lstrip('-')
+        present = [emp for emp in matching if not missing(emp.get(field))]
+        absent = [emp for emp in matching if missing(emp.get(field))]
+        matching = sorted(present, key=lambda emp: emp[field], reverse=sort.startswith('-')) + absent
+    return [emp['id'] for emp in matching]
+
+
+def page_through(client, query):
+    """Follow X-Next-Cursor from the first page to the last, returning (ids, totals seen)."""
+    ids, totals, cursor = [], set(), None
+    while True:
+        url = f'/api/employees?{query}&limit={PAGE_SIZE}&fields=id' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        assert len(page) <= PAGE_SIZE
+        ids += [emp['id'] for emp in page]
+        totals.add(int(response.headers['X-Total-Count']))
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return ids, totals
+
+
+@pytest.mark.parametrize('sort', ['efficiency', '-efficiency', 'name', '-bayHours', 'punctuality'])
+def test_pages_match_full_sort(client, employees, sort):
+    ids, totals = page_through(client, f'sort={sort}')
+    expected = reference(employees, sort=sort)
+    assert ids == expected
+    assert totals == {len(expected)}
+
+
+def test_filtered_pages_match_reference(client, employees):
+    designations = sorted({emp['designation'] for emp in employees if emp['designation']})[:2]
+    ids, totals = page_through(client, f"designation={','.join(designations)}&min_efficiency=50&max_efficiency=90"
+                                       f"&cluster=1,3&sort=-score")
+    expected = reference(
+        employees,
+        lambda emp: (emp['designation'] in designations and emp['cluster'] in (1, 3)
+                     and not missing(emp['efficiency']) and 50 <= emp['efficiency'] <= 90),
+        sort='-score'
+    )
+    assert expected and ids == expected
+    assert totals == {len(expected)}
+
+
+def test_projection(client, employees):
+    page = client.get('/api/employees?fields=id,name&limit=3').get_json()
+    assert page == [{'id': emp['id'], 'name': emp['name']} for emp in employees[:3]]
+    assert client.get('/api/employees?fields=id,salary').status_code == 400
+
+
+def test_cursor_expires_with_the_snapshot(client, monkeypatch):
+    snapshot = app.employee_store.get()
+    cursor = client.get('/api/employees?sort=name&limit=10').headers['X-Next-Cursor']
+    assert client.get(f'/api/employees?sort=name&limit=10&cursor={cursor}').status_code == 200
+
+    # The same employees under a newer data signature, as after a retrain
+    signature = snapshot.signature[:1] + (snapshot.signature[1] + 1,) + snapshot.signature[2:]
+    swapped = app.EmployeeSnapshot(snapshot.employees, signature, snapshot.source, snapshot.labels)
+    monkeypatch.setattr(app.employee_store, 'get', lambda: swapped)
+    response = client.get(f'/api/employees?sort=name&limit=10&cursor={cursor}')
+    assert response.status_code == 400
+    assert 'expired' in response.get_json()['error']
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('1a-2b', 40), '1a-2b') == 40
+    with pytest.raises(QueryError):
+        decode_cursor(encode_cursor('1a-2b', 40), '1a-2c')
+    with pytest.raises(QueryError):
+        decode_cursor('not a cursor!', '1a-2b')
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=x', 'min_efficiency=high', 'cluster=a', 'sort=salary'])
+def test_invalid_queries(client, query):
+    assert client.get(f'/api/employees?{query}').status_code == 400
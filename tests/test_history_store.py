@@ -0,0 +1,106 @@
+# tests/test_history_store.py
+# History parts written chunk by chunk must equal the part written from the whole frame:
+#   python -m pytest tests
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.attendance_snapshot import load_snapshot, save_snapshot
+from src.history_store import (
+    KEY, METRICS, ROLLING_WINDOW, HistoryStore, PartWriter, compute_rollups, history_frame, month_range, write_rollups
+)
+
+LABELS = ['Consistent Performer', 'Silent Overworker', 'Late Starter', 'Erratic / At-Risk']
+
+
+def processed(ids, seed=0):
+    """A processed frame with the recorded columns for the given ids, in that order."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({KEY: ids, 'Name': [f'Employee {value}' for value in ids]})
+    for metric in METRICS:
+        df[metric] = rng.choice(LABELS, len(ids)) if metric == 'Behavior_Type' else rng.normal(70, 10, len(ids))
+    df.loc[df.index[::7], 'Behavior_Type'] = np.nan
+    df.loc[df.index[::11], 'efficiency'] = np.nan
+    return df
+
+
+def whole_part(df, path):
+    """The part HistoryStore.append() writes for df, as read back."""
+    save_snapshot(history_frame(df), path)
+    return load_snapshot(path, mmap=False)
+
+
+def chunked_part(chunks, directory, path, **kwargs):
+    with PartWriter(str(directory), **kwargs) as writer:
+        for chunk in chunks:
+            writer.add(chunk)
+        writer.write(str(path))
+    return load_snapshot(str(path), mmap=False)
+
+
+def chunks_of(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def shuffled_ids(count, seed=0):
+    ids = np.random.default_rng(seed).permutation(count * 3)[:count]
+    # Duplicate ids in other chunks: the first row of each is kept
+    ids[[count // 9, count // 3, count - 1]] = ids[[5, 20, count // 2]]
+    return ids
+
+
+@pytest.mark.parametrize('block_rows', [64, 1000, None])
+def test_int_ids(tmp_path, block_rows):
+    df = processed(shuffled_ids(1000))
+    expected = whole_part(df, tmp_path / 'whole.npz')
+    kwargs = {} if block_rows is None else {'block_rows': block_rows}
+    actual = chunked_part(chunks_of(df, 150), tmp_path / 'scratch', tmp_path / 'part.npz', **kwargs)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize('block_rows', [50, None])
+def test_text_ids(tmp_path, block_rows):
+    df = processed([f'E{value:05d}' for value in shuffled_ids(800, seed=1)], seed=1)
+    expected = whole_part(df, tmp_path / 'whole.npz')
+    kwargs = {} if block_rows is None else {'block_rows': block_rows}
+    actual = chunked_part(chunks_of(df, 130), tmp_path / 'scratch', tmp_path / 'part.npz', **kwargs)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize('block_rows', [40, None])
+def test_mixed_id_types(tmp_path, block_rows):
+    # One chunk of a CSV parsed with numeric ids, another with text ids: all ordered as text
+    df = processed([str(value) for value in shuffled_ids(600, seed=2)], seed=2)
+    chunks = chunks_of(df, 200)
+    chunks[1] = chunks[1].assign(**{KEY: chunks[1][KEY].astype(int)})
+    expected = whole_part(df, tmp_path / 'whole.npz')
+    kwargs = {} if block_rows is None else {'block_rows': block_rows}
+    actual = chunked_part(chunks, tmp_path / 'scratch', tmp_path / 'part.npz', **kwargs)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_scratch_is_removed(tmp_path):
+    with PartWriter(str(tmp_path)) as writer:
+        writer.add(processed([1, 2, 3]))
+        scratch = writer.scratch
+    assert not (tmp_path / scratch).exists()
+
+
+def test_blockwise_rollups(tmp_path):
+    parts = [whole_part(processed(shuffled_ids(500, seed=seed), seed=seed), tmp_path / f'{seed}.npz')
+             for seed in range(3)]
+    # A month without data in the middle
+    parts.insert(1, None)
+    write_rollups(parts, str(tmp_path / 'rollups.npz'), block_rows=64)
+    pd.testing.assert_frame_equal(load_snapshot(str(tmp_path / 'rollups.npz'), mmap=False),
+                                  compute_rollups(parts), check_dtype=False)
+
+
+def test_rollups_cover_calendar_months(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append(processed([1, 2]), 'run-a', '2025-01')
+    store.append(processed([1, 2], seed=1), 'run-b', '2026-01')
+    assert store.window() == month_range('2026-01', ROLLING_WINDOW)
+    # January 2025 is outside the 12 months ending January 2026
+    assert store.rollup('2')['periods'] == 1
+    assert [record['period'] for record in store.query('2')] == ['2025-01', '2026-01']
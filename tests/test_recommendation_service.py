@@ -0,0 +1,261 @@
+# tests/test_recommendation_service.py
+# Caching, coalescing and the concurrency cap of the Gemini recommendations, against a local stub server:
+#   python -m pytest tests
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app
+from src.recommendation_service import PENDING, READY, RecommendationService, TTLCache
+
+# Gemini reply the stub sends, in the format the prompt asks for
+REPLY = (
+    "✅ Schedule a coaching session\nWhy: Improve focus during bay hours\n"
+    "💬 Check in on workload\nWhy: Risk of burnout from long days\n"
+    "🚀 Recognise consistent attendance\nWhy: Keeps morale high"
+)
+
+# Longest any test waits for a thread or the stub
+TIMEOUT = 10
+
+
+class GeminiStub:
+    """Gemini generateContent stand-in that counts POSTs and the calls in flight.
+
+    With hold set, every call blocks until release() so tests can pile up
+    concurrent requests.
+    """
+
+    def __init__(self):
+        self.posts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hold = False
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+        self.arrived = threading.Condition(self.lock)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub.lock:
+                    stub.posts += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    stub.arrived.notify_all()
+                try:
+                    if stub.hold:
+                        stub.released.wait(TIMEOUT)
+                    body = json.dumps({'candidates': [{'content': {'parts': [{'text': REPLY}]}}]}).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1beta/models/stub:generateContent'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def wait_for(self, posts):
+        """Block until at least posts calls have arrived."""
+        with self.arrived:
+            assert self.arrived.wait_for(lambda: self.posts >= posts, TIMEOUT), f'{self.posts} of {posts} calls arrived'
+
+    def release(self):
+        self.released.set()
+
+    def close(self):
+        self.release()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = GeminiStub()
+    monkeypatch.setattr(app, 'GEMINI_API_URL', stub.url)
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(**kwargs):
+        service = RecommendationService(app.call_gemini_api, app.recommendation_inputs, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+
+def employee(employee_id='E1', efficiency=80, cluster='Consistent Performer'):
+    return {
+        'id': employee_id, 'name': f'Employee {employee_id}', 'designation': 'TDS',
+        'efficiency': efficiency, 'attendance': 90, 'bayHours': 6.5, 'punctuality': 85,
+        'score': efficiency, 'clusterType': cluster
+    }
+
+
+def run_threads(target, count):
+    results = [None] * count
+
+    def run(index):
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(TIMEOUT)
+        assert not thread.is_alive()
+
+
+def test_repeat_call_is_cached(stub, make_service):
+    service = make_service()
+    status, key, first = service.get(employee('E1'))
+    assert status == READY and len(first) == 3
+    assert stub.posts == 1
+
+    # Same cluster and metrics, even for another employee: served from the cache
+    assert service.get(employee('E1')) == (READY, key, first)
+    assert service.get(employee('E2')) == (READY, key, first)
+    assert stub.posts == 1
+
+    # Other metrics or another cluster make their own call
+    service.get(employee('E1', efficiency=60))
+    service.get(employee('E1', cluster='Late Starter'))
+    assert stub.posts == 3
+
+
+def test_ttl_expiry(stub, make_service):
+    service = make_service(ttl=60)
+    service.cache.clock = clock = FakeClock()
+    service.get(employee())
+    clock.now = 59
+    service.get(employee())
+    assert stub.posts == 1
+
+    clock.now = 61
+    service.get(employee())
+    assert stub.posts == 2
+
+
+def test_lru_eviction(stub, make_service):
+    service = make_service(cache_size=2)
+    first, second, third = employee(efficiency=70), employee(efficiency=80), employee(efficiency=90)
+    service.get(first)
+    service.get(second)
+    # Touching the first makes the second the least recently used
+    service.get(first)
+    service.get(third)
+    assert stub.posts == 3 and len(service.cache) == 2
+
+    service.get(first)
+    assert stub.posts == 3
+    service.get(second)
+    assert stub.posts == 4
+
+
+def test_ttl_cache():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=5)
+    clock.now = 5
+    assert cache.get('b') is None and cache.get('a') == 1
+    cache.set('c', 3)
+    cache.set('d', 4)
+    assert cache.get('a') is None and cache.get('c') == 3 and len(cache) == 2
+
+
+def test_concurrent_requests_share_one_call(stub, make_service):
+    stub.hold = True
+    service = make_service()
+    threads, results = run_threads(lambda index: service.get(employee(f'E{index}')), 8)
+    stub.wait_for(1)
+    # Give the other requests time to join the call in flight
+    time.sleep(0.2)
+    stub.release()
+    join(threads)
+
+    assert stub.posts == 1
+    assert all(result == results[0] for result in results)
+    assert results[0][0] == READY and len(results[0][2]) == 3
+
+
+def test_calls_in_flight_are_capped(stub, make_service):
+    stub.hold = True
+    service = make_service(max_concurrent=2)
+    threads, results = run_threads(lambda index: service.get(employee(efficiency=50 + index)), 6)
+    stub.wait_for(2)
+    # The others would arrive now if nothing capped them
+    time.sleep(0.2)
+    assert stub.posts == 2
+    stub.release()
+    join(threads)
+
+    assert stub.posts == 6
+    assert stub.max_in_flight == 2
+    assert all(status == READY and recommendations for status, _, recommendations in results)
+
+
+def test_non_blocking_endpoint(stub, make_service, monkeypatch):
+    stub.hold = True
+    monkeypatch.setattr(app, 'recommendation_service', make_service())
+    monkeypatch.setattr(app.recommendation_store, 'get', lambda employee_id: None)
+    employee_id = app.employee_store.get().employees[0]['id']
+    client = app.app.test_client()
+
+    response = client.get(f'/api/recommendations/{employee_id}?wait=0')
+    assert response.status_code == 202
+    assert response.get_json() == {'status': 'pending'}
+    location = response.headers['Location']
+
+    # Polling while the call runs neither blocks nor starts another call
+    assert client.get(location).status_code == 202
+    stub.release()
+
+    deadline = time.monotonic() + TIMEOUT
+    while (response := client.get(location)).status_code == 202:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 3
+    etag = response.headers['ETag']
+    assert stub.posts == 1
+
+    # Served from the cache with the same ETag, and revalidated with a 304
+    again = client.get(location)
+    assert again.status_code == 200 and again.headers['ETag'] == etag
+    assert client.get(location, headers={'If-None-Match': etag}).status_code == 304
+    assert stub.posts == 1
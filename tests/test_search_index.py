@@ -0,0 +1,83 @@
+# tests/test_search_index.py
+# Ranked search of the n-gram index against a brute-force substring scan:
+#   python -m pytest tests
+import random
+
+import pytest
+
+from src.search_index import SEARCH_FIELDS, SearchIndex
+
+
+def brute_force(employees, query, limit=None, offset=0):
+    """Exact id first, then prefix matches of a field or a name word, then other substring matches."""
+    query = query.lower()
+    texts = [[value.lower() if isinstance(value, str) else '' for value in (emp.get(field) for field in SEARCH_FIELDS)]
+             for emp in employees]
+    matches = [position for position, fields in enumerate(texts) if query and any(query in text for text in fields)]
+    exact = next((position for position in matches if texts[position][0] == query), None)
+
+    def prefixed(position):
+        fields = texts[position]
+        return any(text.startswith(query) for text in fields + fields[1].split())
+
+    rest = [position for position in matches if position != exact]
+    ranked = ([exact] if exact is not None else []) + [p for p in rest if prefixed(p)] + [p for p in rest if not prefixed(p)]
+    end = None if limit is None else offset + limit
+    return len(ranked), [employees[position] for position in ranked[offset:end]]
+
+
+@pytest.fixture(scope='module')
+def employees():
+    rng = random.Random(7)
+    first = ['Asha', 'Ravi', 'Zoë', 'Łukasz', 'Anne-Marie', 'Li', 'Ola', 'İlker']
+    last = ['Kumar', "O'Brien", 'Smith', 'Ångström', 'Rao', 'Nair']
+    designations = ['TDS', 'Senior TDS', 'AL', 'Con', 'Lead Consultant', None]
+    employees = [
+        {'id': str(position), 'name': f'{rng.choice(first)} {rng.choice(last)}', 'designation': rng.choice(designations)}
+        for position in range(2000)
+    ]
+    # Duplicate ids, missing and numeric fields, extra whitespace
+    employees[50]['id'] = employees[10]['id']
+    employees[60]['name'] = None
+    employees[70]['id'] = 70
+    employees[80]['name'] = '  Double   Space  '
+    employees[90]['name'] = 'Employee 1234'
+    return employees
+
+
+@pytest.fixture(scope='module')
+def index(employees):
+    return SearchIndex(employees)
+
+
+QUERIES = ['a', 'r', '1', '12', '123', '1234', '10', 'employee 12', 'ee 1', 'tds', 'senior t', 'o\'b', 'zoë',
+           'ÅNG', 'łuk', 'i̇lk', 'double   s', 'anne-m', 'mar', 'con', 'x', 'zzzz', ' ', '  ', 'lead consultant']
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_matches_brute_force(employees, index, query):
+    for limit, offset in [(None, 0), (20, 0), (5, 3), (100, 37), (20, 10**6)]:
+        assert index.search(query, limit, offset) == brute_force(employees, query, limit, offset)
+
+
+def test_random_substrings(employees, index):
+    rng = random.Random(11)
+    for _ in range(500):
+        emp = rng.choice(employees)
+        text = str(emp[rng.choice(SEARCH_FIELDS)] or 'none')
+        start = rng.randrange(len(text))
+        query = text[start:start + rng.randint(1, 8)]
+        assert index.search(query, 20) == brute_force(employees, query, 20), query
+
+
+def test_ranking(index):
+    total, page = index.search('10', 3)
+    # The exact id, then ids and names starting with it, in employee order
+    assert [emp['id'] for emp in page] == ['10', '10', '100']
+    assert total == index.search('10')[0]
+    assert index.search('') == (0, [])
+
+
+def test_empty_index():
+    index = SearchIndex([])
+    assert index.search('a') == (0, [])
@@ -1,12 +1,72 @@
 # train_model.py
-from src.data_preprocessing import preprocess_attendance
-from src.clustering_model import run_clustering
-import joblib
+import argparse
 
-print("🔧 Preprocessing data...")
-df, X_scaled, scaler, features = preprocess_attendance("Cleaned_Attendance_Data.xlsx")
-print("✅ Done preprocessing.")
+from src.data_preprocessing import preprocess_attendance, preprocess_attendance_streaming
+from src.artifact_registry import ArtifactRegistry
+from src.clustering_model import ENGINES, run_clustering, run_clustering_streaming
+from src.history_store import check_period
+from src.model_selection import SILHOUETTE_SAMPLE_SIZE, format_report, select_best, sweep, sweep_report
 
-print("🚀 Running clustering...")
-df, model = run_clustering(df, X_scaled, k=4, scaler=scaler, save=True)
-print("✅ All done! Files saved in /data and /models")
+parser = argparse.ArgumentParser(description="Preprocess attendance data and train the clustering model.")
+parser.add_argument("input", nargs="?", default="Cleaned_Attendance_Data.xlsx",
+                    help="raw attendance export (.xlsx, .csv or .parquet)")
+parser.add_argument("--k", type=int, default=4, help="number of clusters")
+parser.add_argument("--engine", choices=ENGINES, default="kmeans",
+                    help="full KMeans, or MiniBatchKMeans for large populations")
+parser.add_argument("--n-init", type=int, help="number of initialisations")
+parser.add_argument("--max-iter", type=int,
+                    help="maximum iterations per initialisation (with --stream: passes over the data)")
+parser.add_argument("--tol", type=float,
+                    help="convergence tolerance (with --stream: stop once no centroid moves more than this in a pass)")
+parser.add_argument("--warm-start", action="store_true",
+                    help="start from the saved model's centroids, keeping its cluster numbering")
+parser.add_argument("--stream", action="store_true",
+                    help="process the input in chunks without loading it into memory (CSV/Parquet, minibatch)")
+parser.add_argument("--chunksize", type=int, default=100_000, help="rows per chunk with --stream")
+parser.add_argument("--sweep", metavar="MIN-MAX",
+                    help="fit every k in MIN-MAX in parallel, score them and keep the best (e.g. 2-8)")
+parser.add_argument("--seeds", type=int, default=3, help="random seeds per k with --sweep")
+parser.add_argument("--workers", type=int, help="worker processes with --sweep (default: all cores)")
+parser.add_argument("--silhouette-sample", type=int, default=SILHOUETTE_SAMPLE_SIZE,
+                    help="rows sampled for the silhouette score with --sweep")
+parser.add_argument("--period", type=check_period,
+                    help="month the export covers, YYYY-MM, recorded in the attendance history (default: this month)")
+args = parser.parse_args()
+if args.sweep and args.stream:
+    parser.error("--sweep needs the features in memory and cannot be combined with --stream")
+
+if args.stream:
+    print("🔧 Preprocessing data in chunks...")
+    scaler, features, medians = preprocess_attendance_streaming(
+        args.input, "data/attendance_features.csv", chunksize=args.chunksize)
+    print("✅ Done preprocessing.")
+
+    print("🚀 Running clustering...")
+    model = run_clustering_streaming(
+        "data/attendance_features.csv", scaler, features, medians, k=args.k, n_init=args.n_init,
+        max_iter=args.max_iter, tol=args.tol, warm_start=args.warm_start, chunksize=args.chunksize,
+        period=args.period)
+else:
+    print("🔧 Preprocessing data...")
+    df, X_scaled, scaler, features = preprocess_attendance(args.input)
+    print("✅ Done preprocessing.")
+
+    if args.sweep:
+        low, high = (int(value) for value in args.sweep.split("-"))
+        print(f"🔍 Fitting k={low}..{high} with {args.seeds} seeds each...")
+        results = sweep(X_scaled, range(low, high + 1), range(42, 42 + args.seeds), engine=args.engine,
+                        n_init=args.n_init, max_iter=args.max_iter, tol=args.tol,
+                        sample_size=args.silhouette_sample, workers=args.workers)
+        selected = select_best(results)
+        print(format_report(results, selected))
+
+        print("🚀 Running clustering...")
+        df, model = run_clustering(df, X_scaled, scaler=scaler, save=True, model=selected[1],
+                                   scores=selected[0], report=sweep_report(results, selected),
+                                   period=args.period)
+    else:
+        print("🚀 Running clustering...")
+        df, model = run_clustering(
+            df, X_scaled, k=args.k, scaler=scaler, save=True, engine=args.engine, n_init=args.n_init,
+            max_iter=args.max_iter, tol=args.tol, warm_start=args.warm_start, period=args.period)
+print(f"✅ All done! Published run {ArtifactRegistry().current()} to /artifacts")
@@ -0,0 +1,39 @@
+# update_attendance.py
+# Scores a delta of changed or new employees with the saved model instead of retraining,
+# so a daily refresh costs time in proportion to the change:
+#   python update_attendance.py delta.csv
+import argparse
+import json
+import sys
+
+from src.artifact_registry import ARTIFACTS_ROOT, ArtifactRegistry
+from src.delta_update import CHANGE_THRESHOLD, OUTLIER_THRESHOLD, apply_delta
+from src.history_store import check_period
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge changed or new employees into the processed attendance data")
+    parser.add_argument('delta', help='raw attendance export with only the changed or new employees')
+    parser.add_argument('--artifacts', default=ARTIFACTS_ROOT, help='artifact registry to read and publish to')
+    parser.add_argument('--change-threshold', type=float, default=CHANGE_THRESHOLD,
+                        help='share of changed rows that calls for a retrain')
+    parser.add_argument('--outlier-threshold', type=float, default=OUTLIER_THRESHOLD,
+                        help='share of changed rows outside their cluster radius that calls for a retrain')
+    parser.add_argument('--fail-on-drift', action='store_true', help='exit with status 3 when drift is detected')
+    parser.add_argument('--period', type=check_period,
+                        help='month the delta covers, YYYY-MM, recorded in the attendance history (default: this month)')
+    args = parser.parse_args()
+
+    merged, report, manifest = apply_delta(args.delta, ArtifactRegistry(args.artifacts), args.change_threshold,
+                                           args.outlier_threshold, args.period)
+    print(f"✅ Merged {report['changed_rows']} changed rows ({len(merged)} employees), published run {manifest['run_id']}")
+    print(json.dumps(report, indent=2))
+
+    if report['drift']:
+        print(f"⚠️ Drift detected, retrain with train_model.py: {'; '.join(report['reasons'])}")
+        if args.fail_on_drift:
+            sys.exit(3)
+
+
+if __name__ == '__main__':
+    main()